@@ -0,0 +1,10 @@
+import os
+
+
+def post_fork(server, worker):
+    """Load the shared image models once per worker instead of on the first request"""
+    if os.environ.get('PRELOAD_IMAGE_MODELS', '').lower() in ('1', 'true', 'yes'):
+        from myapp.helpers.model_registry import model_registry
+
+        model_registry.warm_up()
+        server.log.info(f"Image models preloaded in worker {worker.pid}")
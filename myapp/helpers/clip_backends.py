@@ -0,0 +1,170 @@
+import os
+from pathlib import Path
+from typing import Any, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TORCH = 'torch'
+BACKEND_TORCH_INT8 = 'torch-int8'
+BACKEND_ONNX = 'onnx'
+BACKENDS = (BACKEND_TORCH, BACKEND_TORCH_INT8, BACKEND_ONNX)
+
+# Minimum cosine similarity between a backend's embeddings and fp32 torch embeddings,
+# enforced by the backend parity test in myapp/tests.py
+PARITY_THRESHOLD = 0.98
+PARITY_PROBE_TEXTS = ["Applicant submits the application", "Officer approves or declines the request"]
+ONNX_OPSET = 17
+
+
+class OnnxClipModel:
+    """CLIP model run through onnxruntime, exposing the subset of the CLIPModel API we use"""
+
+    def __init__(self, config, vision_session, text_session):
+        self.config = config
+        self.vision_session = vision_session
+        self.text_session = text_session
+
+    def eval(self):
+        return self
+
+    def get_image_features(self, pixel_values=None, **kwargs):
+        import torch
+
+        outputs = self.vision_session.run(None, {'pixel_values': pixel_values.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(outputs[0])
+
+    def get_text_features(self, input_ids=None, attention_mask=None, **kwargs):
+        import torch
+
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+        outputs = self.text_session.run(None, {
+            'input_ids': input_ids.cpu().numpy().astype(np.int64),
+            'attention_mask': attention_mask.cpu().numpy().astype(np.int64)
+        })
+        return torch.from_numpy(outputs[0])
+
+
+def load_clip_backend(model_name: str, backend: str) -> Tuple[Any, Any, str]:
+    """Load ``(processor, model, loaded backend)`` for the requested inference backend.
+
+    Non-fp32 backends are derived from the fp32 model; if that fails the fp32
+    model is returned and the loaded backend is reported as ``torch``. Their
+    numerical parity with fp32 is covered by the test suite, not checked here.
+    """
+    from transformers import CLIPProcessor, CLIPModel
+
+    processor = CLIPProcessor.from_pretrained(model_name)
+    model = CLIPModel.from_pretrained(model_name)
+    model.eval()
+
+    if backend == BACKEND_TORCH:
+        return processor, model, BACKEND_TORCH
+
+    try:
+        return processor, build_backend_model(model_name, model, backend), backend
+    except Exception as e:
+        logger.error(f"Error loading CLIP {backend} backend, falling back to fp32 torch: {e}")
+        return processor, model, BACKEND_TORCH
+
+
+def build_backend_model(model_name: str, model, backend: str):
+    """Derive the ``backend`` variant of an fp32 CLIP model"""
+    if backend == BACKEND_TORCH:
+        return model
+    if backend == BACKEND_TORCH_INT8:
+        return _quantize_dynamic(model)
+    if backend == BACKEND_ONNX:
+        return _load_onnx(model_name, model)
+    raise ValueError(f"Unknown CLIP inference backend '{backend}', expected one of {BACKENDS}")
+
+
+def check_backend_parity(processor, reference_model, candidate_model) -> float:
+    """Lowest cosine similarity between reference and candidate embeddings on a fixed probe set"""
+    import torch
+    from PIL import Image
+
+    gradient = np.tile(np.linspace(0, 255, 224, dtype=np.uint8), (224, 1))
+    probe_image = Image.fromarray(np.stack([gradient, gradient.T, 255 - gradient], axis=-1))
+
+    image_inputs = processor(images=[probe_image], return_tensors="pt")
+    text_inputs = processor(text=PARITY_PROBE_TEXTS, return_tensors="pt", padding=True)
+
+    similarities = []
+    with torch.no_grad():
+        for method, inputs in (('get_image_features', image_inputs), ('get_text_features', text_inputs)):
+            expected = getattr(reference_model, method)(**inputs)
+            actual = getattr(candidate_model, method)(**inputs)
+            similarities.append(torch.nn.functional.cosine_similarity(expected, actual, dim=-1).min().item())
+    return min(similarities)
+
+
+def _quantize_dynamic(model):
+    import torch
+
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(model_name: str, model) -> OnnxClipModel:
+    import onnxruntime
+
+    from .config import get_setting
+
+    export_dir = Path(get_setting('CLIP_ONNX_DIR') or os.path.join(os.getcwd(), "cache", "onnx")) / model_name.replace('/', '--')
+    vision_path = export_dir / "vision.onnx"
+    text_path = export_dir / "text.onnx"
+    if not vision_path.exists() or not text_path.exists():
+        _export_onnx(model, export_dir)
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    providers = ['CPUExecutionProvider']
+    return OnnxClipModel(
+        model.config,
+        onnxruntime.InferenceSession(str(vision_path), options, providers=providers),
+        onnxruntime.InferenceSession(str(text_path), options, providers=providers)
+    )
+
+
+def _export_onnx(model, export_dir: Path):
+    import torch
+
+    class VisionProjection(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, pixel_values):
+            return self.clip_model.get_image_features(pixel_values=pixel_values)
+
+    class TextProjection(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, input_ids, attention_mask):
+            return self.clip_model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+    export_dir.mkdir(parents=True, exist_ok=True)
+    image_size = model.config.vision_config.image_size
+    sequence_length = model.config.text_config.max_position_embeddings
+
+    exports = [
+        (VisionProjection(model), (torch.zeros(1, 3, image_size, image_size),), 'vision.onnx',
+         ['pixel_values'], ['image_embeds'], {'pixel_values': {0: 'batch'}, 'image_embeds': {0: 'batch'}}),
+        (TextProjection(model),
+         (torch.ones(1, sequence_length, dtype=torch.long), torch.ones(1, sequence_length, dtype=torch.long)),
+         'text.onnx', ['input_ids', 'attention_mask'], ['text_embeds'],
+         {'input_ids': {0: 'batch', 1: 'sequence'}, 'attention_mask': {0: 'batch', 1: 'sequence'},
+          'text_embeds': {0: 'batch'}}),
+    ]
+    for module, sample_inputs, filename, input_names, output_names, dynamic_axes in exports:
+        # Export to a per-process temp file and rename, so concurrent workers never read a partial graph
+        temp_path = export_dir / f"{filename}.{os.getpid()}.tmp"
+        torch.onnx.export(module, sample_inputs, str(temp_path), input_names=input_names,
+                          output_names=output_names, dynamic_axes=dynamic_axes, opset_version=ONNX_OPSET)
+        os.replace(temp_path, export_dir / filename)
+        logger.info(f"Exported CLIP {filename} to {export_dir}")
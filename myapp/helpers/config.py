@@ -0,0 +1,18 @@
+import os
+from typing import Any
+
+
+def get_setting(name: str, default: Any = None) -> Any:
+    """Read a tuning knob from Django settings, falling back to the environment.
+
+    Model loading can happen before Django is configured (e.g. gunicorn's
+    post_fork hook), so environment variables of the same name also work.
+    """
+    try:
+        from django.conf import settings
+
+        if settings.configured and hasattr(settings, name):
+            return getattr(settings, name)
+    except ImportError:
+        pass
+    return os.environ.get(name, default)
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+import logging
+
+import numpy as np
+
+from .config import get_setting
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 2048
+CACHE_DB_NAME = "embeddings.sqlite3"
+DEFAULT_CACHE_DIR = "cache"
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_file(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache.
+
+    Keys are ``(model name, preprocessing version, content hash)``. Lookups go
+    through an in-memory LRU tier first and fall back to a SQLite blob store on
+    disk, so identical images or texts only cost a hash on re-upload.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_memory_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.cache_dir = Path(cache_dir or get_setting('EMBEDDING_CACHE_DIR') or os.path.join(os.getcwd(), DEFAULT_CACHE_DIR))
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(model_name: str, preprocessing_version: str, content_hash: str) -> str:
+        return f"{model_name}:{preprocessing_version}:{content_hash}"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return vector
+
+            vector = self._read_from_disk(key)
+            if vector is None:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['disk_hits'] += 1
+            self._remember(key, vector)
+            return vector
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors for the keys that are present"""
+        found = {}
+        for key in keys:
+            vector = self.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def set(self, key: str, vector: np.ndarray):
+        self.set_many({key: vector})
+
+    def set_many(self, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            rows = []
+            for key, vector in items.items():
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes()))
+
+            try:
+                connection = self._get_connection()
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO embeddings (cache_key, vector) VALUES (?, ?)", rows
+                    )
+            except Exception as e:
+                logger.error(f"Error writing embeddings to disk cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            try:
+                connection = self._get_connection()
+                with connection:
+                    connection.execute("DELETE FROM embeddings")
+            except Exception as e:
+                logger.error(f"Error clearing embedding disk cache: {e}")
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_from_disk(self, key: str) -> Optional[np.ndarray]:
+        try:
+            row = self._get_connection().execute(
+                "SELECT vector FROM embeddings WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            return np.frombuffer(row[0], dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error reading embedding from disk cache: {e}")
+            return None
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Callers hold self._lock, so a single connection can be shared across threads
+        if self._connection is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.cache_dir / CACHE_DB_NAME), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (cache_key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+        return self._connection
+
+
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
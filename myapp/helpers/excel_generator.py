@@ -1,84 +1,161 @@
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from typing import List, Dict
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from typing import Any, BinaryIO, List, Dict, Optional, Union, Iterable, Iterator, Tuple
+import functools
 import io
-import os
 import logging
+from .generated_files import export_store, new_file_id, sweep_generated_files
+from .test_case_table import TestCaseTable
 
 logger = logging.getLogger(__name__)
 
+# Test case fields copied into the generated sheet, with defaults for missing fields
+TESTCASE_SOURCE_FIELDS = ['Use Case', 'Test Scenario', 'Priority', 'Preconditions', 'Input', 'Expected Result']
+TESTCASE_FIELD_DEFAULTS = {'Priority': 'P2'}
+
+TestCases = Union[List[Dict], TestCaseTable]
+
+# Headers and column widths of the generated sheets
+SUMMARY_HEADERS = [
+    'Service', '# P1 Total Tests', '# P1 Tests run', 'P1 Run / Total', '# P1 Tests passed',
+    '# P1 Tests Blocked', 'P1 Passed / P1 Total', '# Total Tests', '# Tests run', 'Run / Total',
+    '# Tests passed', '# Tests Failed', '# Tests Blocked', 'Passed / Total', 'Test Data Details'
+]
+SUMMARY_COLUMN_WIDTHS = {
+    'A': 20, 'B': 12, 'C': 12, 'D': 12, 'E': 12, 'F': 12, 'G': 15, 'H': 12,
+    'I': 12, 'J': 12, 'K': 12, 'L': 12, 'M': 12, 'N': 15, 'O': 15
+}
+TESTCASE_HEADERS = [
+    'Use Case', 'Test Scenario', 'Priority', 'Preconditions', 'Input',
+    'Expected Result', 'Test Result', 'Comments', 'Tester', 'Execution Date'
+]
+TESTCASE_COLUMN_WIDTHS = {
+    'A': 25, 'B': 40, 'C': 10, 'D': 30, 'E': 30, 'F': 40, 'G': 15, 'H': 25, 'I': 15, 'J': 15
+}
+# Execution columns left empty, to be filled in during test execution
+TESTCASE_EXECUTION_PADDING = ('', '', '', '')
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _solid_fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+_THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_BODY_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+
+# Cell style palette: registered once per workbook as NamedStyles and applied to cells by name
+STYLE_SUMMARY_HEADER = 'Summary Header'
+STYLE_SUMMARY_VALUE = 'Summary Value'
+STYLE_TESTCASE_HEADER = 'Test Case Header'
+STYLE_TESTCASE_BODY = 'Test Case Body'
+PRIORITY_STYLES = {'P1': 'Test Case P1', 'P2': 'Test Case P2', 'P3': 'Test Case P3'}
+
+NAMED_STYLE_ATTRIBUTES = {
+    STYLE_SUMMARY_HEADER: dict(font=_HEADER_FONT, fill=_solid_fill("4472C4"), alignment=_HEADER_ALIGNMENT, border=_THIN_BORDER),
+    STYLE_SUMMARY_VALUE: dict(font=DEFAULT_FONT, alignment=Alignment(horizontal="center", vertical="center"), border=_THIN_BORDER),
+    STYLE_TESTCASE_HEADER: dict(font=_HEADER_FONT, fill=_solid_fill("366092"), alignment=_HEADER_ALIGNMENT, border=_THIN_BORDER),
+    STYLE_TESTCASE_BODY: dict(font=DEFAULT_FONT, alignment=_BODY_ALIGNMENT, border=_THIN_BORDER),
+    PRIORITY_STYLES['P1']: dict(font=DEFAULT_FONT, fill=_solid_fill("FFE6E6"), alignment=_BODY_ALIGNMENT, border=_THIN_BORDER),
+    PRIORITY_STYLES['P2']: dict(font=DEFAULT_FONT, fill=_solid_fill("FFF2E6"), alignment=_BODY_ALIGNMENT, border=_THIN_BORDER),
+    PRIORITY_STYLES['P3']: dict(font=DEFAULT_FONT, fill=_solid_fill("E6F3FF"), alignment=_BODY_ALIGNMENT, border=_THIN_BORDER),
+}
+
+
+def register_named_styles(workbook: openpyxl.Workbook):
+    """Add the generator's style palette to a workbook (NamedStyles bind to a single workbook)"""
+    for name, attributes in NAMED_STYLE_ATTRIBUTES.items():
+        if name not in workbook.named_styles:
+            workbook.add_named_style(NamedStyle(name=name, **attributes))
+
+
+def iter_test_case_values(test_cases: Union[Iterable[Dict], TestCaseTable]) -> Iterator[Tuple]:
+    """Yield the TESTCASE_SOURCE_FIELDS values of each test case, reading table columns directly"""
+    if isinstance(test_cases, TestCaseTable):
+        return test_cases.iter_rows(TESTCASE_SOURCE_FIELDS, TESTCASE_FIELD_DEFAULTS)
+    return (
+        tuple(test_case.get(field, TESTCASE_FIELD_DEFAULTS.get(field, '')) for field in TESTCASE_SOURCE_FIELDS)
+        for test_case in test_cases
+    )
+
+
 class ExcelGenerator:
     def __init__(self):
         self.workbook = None
         self.worksheet = None
     
-    def generate_testcase_excel(self, test_cases: List[Dict], service_name: str) -> str:
+    def generate_testcase_excel(self, test_cases: TestCases, service_name: str, streaming: bool = False,
+                                export_id: Optional[str] = None) -> Optional[str]:
+        """Write the test cases workbook to files/<export_id>.xlsx and return the export ID.
+
+        ``streaming`` uses the write-only engine. Each call gets its own file (a
+        new export ID unless one is given), written atomically so concurrent
+        generations never clobber each other. The export can be found again with
+        ``export_store.find(export_id)``. Returns None if generation failed.
+        """
         try:
-            self.workbook = openpyxl.Workbook()
-            self.worksheet = self.workbook.active
-            self.worksheet.title = "Test Cases"
-            
-            # Create summary sheet
-            self._create_summary_sheet(test_cases, service_name)
+            export_id = export_id or new_file_id()
             
-            # Create test cases sheet
-            self._create_testcases_sheet(test_cases)
-            
-            filename = "testcases.xlsx"
-            folder = os.path.join(os.getcwd(), "files")
-
-            if not os.path.exists(folder):
-                os.makedirs(folder)
-
-            filepath = os.path.join(folder, f"{filename}")
+            if streaming:
+                write = functools.partial(self.write_testcase_workbook, test_cases, service_name)
+            else:
+                self.workbook = openpyxl.Workbook()
+                register_named_styles(self.workbook)
+                self.worksheet = self.workbook.active
+                self.worksheet.title = "Test Cases"
+                
+                # Create summary sheet
+                self._create_summary_sheet(test_cases, service_name)
+                
+                # Create test cases sheet
+                self._create_testcases_sheet(test_cases)
+                
+                write = self.workbook.save
             
-            self.workbook.save(filepath)
-            print(f"Excel file saved successfully: {filepath}")
-            return filepath
+            filepath = export_store.write_atomic(export_id, '.xlsx', write)
+            sweep_generated_files()
+            logger.info(f"Excel file saved successfully: {filepath}")
+            return export_id
             
         except Exception as e:
             logger.error(f"Error generating Excel file: {e}")
-            print(f"Error generating Excel file: {e}")
             return None
     
-    def _create_summary_sheet(self, test_cases: List[Dict], service_name: str):
+    def _create_summary_sheet(self, test_cases: TestCases, service_name: str):
         """Create summary sheet with test statistics matching the required format"""
         summary_ws = self.workbook.create_sheet("Summary", 0)
         
         # Define headers exactly as shown in screenshot
-        headers = [
-            'Service',
-            '# P1 Total Tests',
-            '# P1 Tests run',
-            'P1 Run / Total',
-            '# P1 Tests passed',
-            '# P1 Tests Blocked',
-            'P1 Passed / P1 Total',
-            '# Total Tests',
-            '# Tests run',
-            'Run / Total',
-            '# Tests passed',
-            '# Tests Failed',
-            '# Tests Blocked',
-            'Passed / Total',
-            'Test Data Details'
-        ]
+        headers = SUMMARY_HEADERS
         
         # Add headers with blue background and white text
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
         for col_idx, header in enumerate(headers, start=1):
-            cell = summary_ws.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
+            summary_ws.cell(row=1, column=col_idx, value=header).style = STYLE_SUMMARY_HEADER
         
         # Calculate statistics
         total_tests = len(test_cases)
-        p1_tests = len([tc for tc in test_cases if tc.get('priority') == 'P1'])
+        if isinstance(test_cases, TestCaseTable):
+            p1_tests = test_cases.count_value('Priority', 'P1')
+        else:
+            p1_tests = len([tc for tc in test_cases if tc.get('Priority') == 'P1'])
+        data_row = self._summary_row(service_name, total_tests, p1_tests)
         
+        # Add data row
+        for col_idx, value in enumerate(data_row, start=1):
+            summary_ws.cell(row=2, column=col_idx, value=value).style = STYLE_SUMMARY_VALUE
+        
+        # Set column widths to match screenshot layout
+        column_widths = SUMMARY_COLUMN_WIDTHS
+        
+        for column_letter, width in column_widths.items():
+            summary_ws.column_dimensions[column_letter].width = width
+
+    def _summary_row(self, service_name: str, total_tests: int, p1_tests: int) -> List[Any]:
         # For demo purposes, assuming all tests are run and passed (100% success rate)
         # In real implementation, these would come from actual test execution results
         tests_run = total_tests
@@ -96,8 +173,7 @@ class ExcelGenerator:
         run_percentage = f"{(tests_run / total_tests * 100):.2f}%" if total_tests > 0 else "0.00%"
         passed_percentage = f"{(tests_passed / total_tests * 100):.2f}%" if total_tests > 0 else "0.00%"
         
-        # Data row
-        data_row = [
+        return [
             service_name,
             p1_tests,
             p1_tests_run,
@@ -114,139 +190,95 @@ class ExcelGenerator:
             passed_percentage,
             ""  # Test Data Details - empty for now
         ]
-        
-        # Add data row
-        for col_idx, value in enumerate(data_row, start=1):
-            cell = summary_ws.cell(row=2, column=col_idx, value=value)
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Set column widths to match screenshot layout
-        column_widths = {
-            'A': 20,  # Service
-            'B': 12,  # # P1 Total Tests
-            'C': 12,  # # P1 Tests run
-            'D': 12,  # P1 Run / Total
-            'E': 12,  # # P1 Tests passed
-            'F': 12,  # # P1 Tests Blocked
-            'G': 15,  # P1 Passed / P1 Total
-            'H': 12,  # # Total Tests
-            'I': 12,  # # Tests run
-            'J': 12,  # Run / Total
-            'K': 12,  # # Tests passed
-            'L': 12,  # # Tests Failed
-            'M': 12,  # # Tests Blocked
-            'N': 15,  # Passed / Total
-            'O': 15   # Test Data Details
-        }
-        
-        for column_letter, width in column_widths.items():
-            summary_ws.column_dimensions[column_letter].width = width
-        
-        # Add borders
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        for row in summary_ws.iter_rows(min_row=1, max_row=2, min_col=1, max_col=len(headers)):
-            for cell in row:
-                cell.border = thin_border
 
-    def _create_testcases_sheet(self, test_cases: List[Dict]):
+    def _create_testcases_sheet(self, test_cases: TestCases):
         """Create detailed test cases sheet"""
         # Headers
-        headers = [
-            'Use Case',
-            'Test Scenario',
-            'Priority',
-            'Preconditions',
-            'Input',
-            'Expected Result',
-            'Test Result',
-            'Comments',
-            'Tester',
-            'Execution Date'
-        ]
-        
-        # Style for headers
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        headers = TESTCASE_HEADERS
         
         # Add headers
         for col_idx, header in enumerate(headers, start=1):
-            cell = self.worksheet.cell(row=1, column=col_idx, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
+            self.worksheet.cell(row=1, column=col_idx, value=header).style = STYLE_TESTCASE_HEADER
         
-        # Add test cases data
-        for row_idx, test_case in enumerate(test_cases, start=2):
-            row_data = [
-                test_case.get('Use Case', ''),
-                test_case.get('Test Scenario', ''),
-                test_case.get('Priority', 'P2'),
-                test_case.get('Preconditions', ''),
-                test_case.get('Input', ''),
-                test_case.get('Expected Result', ''),
-                '',  # Test Result - to be filled during execution
-                '',  # Comments - to be filled during execution
-                '',  # Tester - to be filled during execution
-                ''   # Execution Date - to be filled during execution
-            ]
+        # Add test cases data, color coding the priority column
+        for row_idx, source_values in enumerate(iter_test_case_values(test_cases), start=2):
+            row_data = [*source_values, *TESTCASE_EXECUTION_PADDING]
             
             for col_idx, value in enumerate(row_data, start=1):
                 cell = self.worksheet.cell(row=row_idx, column=col_idx, value=value)
-                cell.alignment = Alignment(vertical="top", wrap_text=True)
-                
-                # Color coding for priorities
-                if col_idx == 3:  # Priority column
-                    if value == 'P1':
-                        cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")
-                    elif value == 'P2':
-                        cell.fill = PatternFill(start_color="FFF2E6", end_color="FFF2E6", fill_type="solid")
-                    elif value == 'P3':
-                        cell.fill = PatternFill(start_color="E6F3FF", end_color="E6F3FF", fill_type="solid")
+                cell.style = PRIORITY_STYLES.get(value, STYLE_TESTCASE_BODY) if col_idx == 3 else STYLE_TESTCASE_BODY
         
         # Auto-adjust column widths
-        column_widths = {
-            'A': 25,  # Use Case
-            'B': 40,  # Test Scenario
-            'C': 10,  # Priority
-            'D': 30,  # Preconditions
-            'E': 30,  # Input
-            'F': 40,  # Expected Result
-            'G': 15,  # Test Result
-            'H': 25,  # Comments
-            'I': 15,  # Tester
-            'J': 15   # Execution Date
-        }
+        column_widths = TESTCASE_COLUMN_WIDTHS
         
         for column_letter, width in column_widths.items():
             self.worksheet.column_dimensions[column_letter].width = width
         
-        # Add borders
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        for row in self.worksheet.iter_rows(min_row=1, max_row=len(test_cases) + 1, 
-                                          min_col=1, max_col=len(headers)):
-            for cell in row:
-                cell.border = thin_border
-        
         # Freeze the header row
         self.worksheet.freeze_panes = 'A2'
     
-    def get_excel_bytes(self, test_cases: List[Dict], service_name: str) -> bytes:
+    def write_testcase_workbook(self, test_cases: Union[Iterable[Dict], TestCaseTable], service_name: str,
+                                destination: Union[str, BinaryIO]):
+        """Stream test cases into a write-only workbook saved to ``destination`` (a path or binary file).
+
+        Produces the same sheets and styling as ``generate_testcase_excel``, but
+        rows are written as they are read from ``test_cases`` (any iterable of
+        dicts, or a TestCaseTable) and are never held in memory as cells.
+        """
+        workbook = openpyxl.Workbook(write_only=True)
+        
+        # The summary needs the totals, so the test cases sheet is written first and the summary put before it
+        testcases_ws = workbook.create_sheet("Test Cases")
+        for column_letter, width in TESTCASE_COLUMN_WIDTHS.items():
+            testcases_ws.column_dimensions[column_letter].width = width
+        testcases_ws.freeze_panes = 'A2'
+        
+        register_named_styles(workbook)
+        
+        testcases_ws.append([self._styled_cell(testcases_ws, header, STYLE_TESTCASE_HEADER) for header in TESTCASE_HEADERS])
+        
+        total_tests = 0
+        p1_tests = 0
+        for source_values, is_p1 in self._iter_test_case_rows(test_cases):
+            row = [self._styled_cell(testcases_ws, value, STYLE_TESTCASE_BODY) for value in (*source_values, *TESTCASE_EXECUTION_PADDING)]
+            priority_style = PRIORITY_STYLES.get(source_values[2])
+            if priority_style is not None:
+                row[2] = self._styled_cell(testcases_ws, source_values[2], priority_style)
+            testcases_ws.append(row)
+            total_tests += 1
+            p1_tests += is_p1
+        
+        summary_ws = workbook.create_sheet("Summary", 0)
+        for column_letter, width in SUMMARY_COLUMN_WIDTHS.items():
+            summary_ws.column_dimensions[column_letter].width = width
+        summary_ws.append([self._styled_cell(summary_ws, header, STYLE_SUMMARY_HEADER) for header in SUMMARY_HEADERS])
+        summary_ws.append([
+            self._styled_cell(summary_ws, value, STYLE_SUMMARY_VALUE)
+            for value in self._summary_row(service_name, total_tests, p1_tests)
+        ])
+        
+        workbook.save(destination)
+    
+    def _styled_cell(self, worksheet, value: Any, style_name: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(worksheet, value)
+        cell.style = style_name
+        return cell
+    
+    def _iter_test_case_rows(self, test_cases: Union[Iterable[Dict], TestCaseTable]) -> Iterator[Tuple[Tuple, bool]]:
+        """Yield ``(source field values, counts as P1)`` per test case, consuming ``test_cases`` once"""
+        priority_idx = TESTCASE_SOURCE_FIELDS.index('Priority')
+        return ((values, values[priority_idx] == 'P1') for values in iter_test_case_values(test_cases))
+    
+    def get_excel_bytes(self, test_cases: TestCases, service_name: str, streaming: bool = False) -> bytes:
         """Generate Excel file and return as bytes"""
         try:
+            if streaming:
+                excel_buffer = io.BytesIO()
+                self.write_testcase_workbook(test_cases, service_name, excel_buffer)
+                return excel_buffer.getvalue()
+            
             self.workbook = openpyxl.Workbook()
+            register_named_styles(self.workbook)
             self.worksheet = self.workbook.active
             self.worksheet.title = "Test Cases"
             
@@ -1,13 +1,86 @@
 import pandas as pd
 from openpyxl import load_workbook
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, Iterator, Iterable, NamedTuple
 import logging
 from django.core.files.uploadedfile import UploadedFile
 from collections import defaultdict
+from collections.abc import Mapping
 import re
+import io
+import datetime
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .config import get_setting
+from .test_case_table import TestCaseTable
 
 logger = logging.getLogger(__name__)
 
+# Workbook reader: 'openpyxl' (streaming read-only mode) or 'calamine' (needs python-calamine)
+DEFAULT_EXCEL_READER_BACKEND = 'openpyxl'
+
+# Sheet type and test case headers are only looked for in the first rows of a sheet
+HEADER_SCAN_ROWS = 100
+MAIN_SHEET_KEYWORDS = ['statistic', 'summary', 'dashboard']
+SHEET_TYPE_HEADERS = ['use case', 'test scenario', 'priority']
+HEADER_ROW_INDICATORS = ['use case', 'test scenario', 'priority', 'expected result']
+
+DEFAULT_INGESTION_WORKERS = min(4, os.cpu_count() or 1)
+# Ingestion workers are spawned, never forked, so they do not inherit the web worker's
+# threads and locks (a forked child can deadlock on a lock held at fork time)
+INGESTION_MP_CONTEXT = 'spawn'
+
+# Default upper bound, in characters, on the size of a text chunk produced for embedding
+DEFAULT_TEXT_CHUNK_CHARS = 2000
+
+# Section keywords in priority order: a row is classified by the first section it matches
+SECTION_KEYWORDS = [
+    ('title', ['test execution report', 'test report', 'service']),
+    ('statistics', ['test execution statistics', 'statistics', 'p1 total tests']),
+    ('environment', ['test environment', 'environment', 'test data details']),
+    ('test_cases', ['detailed test cases', 'test cases', 'use case'])
+]
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_HEADER_SEPARATOR_RE = re.compile(r'[\s_]+')
+_SECTION_BREAK_RE = re.compile(r'detailed test cases|test environment|statistics', re.IGNORECASE)
+_SERVICE_NAME_RE = re.compile(r'test execution report\s*-\s*(.+)', re.IGNORECASE)
+_SERVICE_CODE_RE = re.compile(r'\[([^\]]+)\]')
+_SECTION_RE = re.compile(
+    '|'.join(
+        f"(?P<{name}>{'|'.join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True))})"
+        for name, keywords in SECTION_KEYWORDS
+    ),
+    re.IGNORECASE
+)
+
+
+def normalize_cell_text(value: str) -> str:
+    """Collapse all runs of whitespace (including newlines) to single spaces"""
+    return _WHITESPACE_RE.sub(' ', value).strip()
+
+
+def normalize_header(header: str) -> str:
+    """Lookup key for a column header: lowercase, with spaces/underscores collapsed"""
+    return _HEADER_SEPARATOR_RE.sub(' ', header).strip().lower()
+
+
+def _row_text(row: Iterable[Any]) -> str:
+    return ' '.join(str(cell) if cell else '' for cell in row)
+
+
+class TextChunk(NamedTuple):
+    """A bounded piece of a workbook's text representation.
+
+    ``id`` is ``"<sheet>!<row>"`` for the sheet row of the chunk's first test
+    case, with a ``#<part>`` suffix when one test case spans several chunks.
+    """
+    id: str
+    text: str
+
 class ExcelProcessor:
     def __init__(self):
         self.test_case_columns = [
@@ -45,118 +118,237 @@ class ExcelProcessor:
             'date': 'Execution Date',
             'executed on': 'Execution Date'
         }
+        
+        # Normalized-key index over column_mappings, so header variants resolve with one lookup
+        self.header_index = {normalize_header(key): value for key, value in self.column_mappings.items()}
     
-    def extract_comprehensive_data_from_excel(self, excel_file: UploadedFile) -> Dict[str, Any]:
-        """Extract comprehensive test data from Excel file"""
+    def extract_comprehensive_data_from_excel(self, excel_file: UploadedFile, lazy_raw_sheets: bool = False,
+                                              as_table: bool = False) -> Dict[str, Any]:
+        """Extract comprehensive test data from Excel file.
+
+        With ``lazy_raw_sheets`` the sheets' raw content is not kept while parsing;
+        ``raw_sheets_data`` then re-reads a sheet from a copy of the workbook on first access.
+        ``test_cases`` is a list of dicts, or with ``as_table`` the compact TestCaseTable
+        (which ExcelGenerator and the exporters also accept).
+        """
         try:
-            # Load workbook
-            workbook = load_workbook(excel_file, data_only=True)
-            
-            comprehensive_data = {
-                'service_info': {},
-                'test_cases': [],
-                'summary_metrics': {},
-                'raw_sheets_data': {}
-            }
-            
-            # Process each sheet
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
+            # Stream each sheet once, collecting raw data, sheet type and test cases together
+            sheet_results = []
+            for sheet_name, row_stream in self._iter_workbook_sheets(excel_file):
                 logger.info(f"Processing sheet: {sheet_name}")
-                
-                # Store raw sheet data
-                comprehensive_data['raw_sheets_data'][sheet_name] = self._extract_sheet_data(sheet)
-                
-                # Identify sheet type and extract accordingly
-                sheet_type = self._identify_sheet_type(sheet, sheet_name)
-                
-                if sheet_type == 'test_cases':
-                    test_cases = self._extract_test_cases_from_sheet(sheet)
-                    comprehensive_data['test_cases'].extend(test_cases)
+                sheet_results.append((sheet_name, *self._analyze_sheet_rows(row_stream, sheet_name, not lazy_raw_sheets)))
             
-            # Clean and validate data
-            comprehensive_data = self._clean_and_validate_data(comprehensive_data)
-            
-            return comprehensive_data
+            return self._with_test_case_dicts(self._build_comprehensive_data(sheet_results, excel_file), as_table)
             
         except Exception as e:
             logger.error(f"Error extracting comprehensive data from Excel: {e}")
             return {}
     
-    def _extract_sheet_data(self, sheet) -> List[List[Any]]:
-        """Extract raw data from a sheet"""
-        try:
-            data = []
-            for row in sheet.iter_rows(values_only=True):
-                # Convert None values to empty strings and clean data
-                clean_row = [str(cell).strip() if cell is not None else "" for cell in row]
-                data.append(clean_row)
-            return data
-        except Exception as e:
-            logger.error(f"Error extracting sheet data: {e}")
-            return []
+    def extract_comprehensive_data_from_excel_files(self, excel_files: List[UploadedFile],
+                                                     lazy_raw_sheets: bool = False,
+                                                     as_table: bool = False) -> List[Dict[str, Any]]:
+        """Extract comprehensive test data from many Excel files, one file per pool worker.
+
+        Results are returned in input order. A file that cannot be read or
+        parsed yields ``{'error': message}`` without affecting the others. A
+        single file is parsed in-process. ``lazy_raw_sheets`` and ``as_table`` work
+        as in ``extract_comprehensive_data_from_excel``.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(excel_files)
+        
+        payloads = []
+        for idx, excel_file in enumerate(excel_files):
+            try:
+                if hasattr(excel_file, 'seek'):
+                    excel_file.seek(0)
+                payloads.append((idx, excel_file.read()))
+            except Exception as e:
+                logger.error(f"Error reading Excel file {getattr(excel_file, 'name', idx)}: {e}")
+                results[idx] = {'error': str(e)}
+        
+        # A single file is not worth a round-trip through the pool
+        pool, futures = None, {}
+        if len(payloads) > 1:
+            pool = get_ingestion_pool()
+            futures = {idx: pool.submit(_analyze_workbook_sheets, data, not lazy_raw_sheets) for idx, data in payloads}
+        
+        for idx, data in payloads:
+            try:
+                if idx in futures:
+                    sheet_results = futures[idx].result()
+                else:
+                    sheet_results = _analyze_workbook_sheets(data, not lazy_raw_sheets)
+                results[idx] = self._with_test_case_dicts(self._build_comprehensive_data(sheet_results, data), as_table)
+            except BrokenProcessPool as e:
+                logger.error(f"Excel ingestion pool failed on file {getattr(excel_files[idx], 'name', idx)}: {e}")
+                reset_ingestion_pool(pool)
+                results[idx] = {'error': str(e)}
+            except Exception as e:
+                logger.error(f"Error extracting comprehensive data from Excel file {getattr(excel_files[idx], 'name', idx)}: {e}")
+                results[idx] = {'error': str(e)}
+        
+        return results
+    
+    def _with_test_case_dicts(self, comprehensive_data: Dict[str, Any], as_table: bool = False) -> Dict[str, Any]:
+        # Test cases are only expanded into dicts for callers that did not ask for the table
+        test_cases = comprehensive_data.get('test_cases')
+        if not as_table and isinstance(test_cases, TestCaseTable):
+            comprehensive_data['test_cases'] = test_cases.to_dicts()
+        return comprehensive_data
     
-    def _identify_sheet_type(self, sheet, sheet_name: str) -> str:
-        """Identify the type of sheet based on content and name"""
+    def _build_comprehensive_data(self, sheet_results: List[Tuple[str, Optional[List[List[str]]], str, TestCaseTable]],
+                                  source: Any = None) -> Dict[str, Any]:
+        comprehensive_data = {
+            'service_info': {},
+            'test_cases': TestCaseTable(),
+            'summary_metrics': {},
+            'raw_sheets_data': {}
+        }
+        
+        lazy_sheet_names = []
+        for sheet_name, raw_data, sheet_type, test_cases in sheet_results:
+            # Store raw sheet data, or defer it to a re-read of the source
+            if raw_data is None:
+                lazy_sheet_names.append(sheet_name)
+            else:
+                comprehensive_data['raw_sheets_data'][sheet_name] = raw_data
+            
+            if sheet_type == 'test_cases':
+                comprehensive_data['test_cases'].extend(test_cases)
+        
+        if lazy_sheet_names:
+            comprehensive_data['raw_sheets_data'] = RawSheetsData(self, source, lazy_sheet_names)
+        
+        # Clean and validate data
+        return self._clean_and_validate_data(comprehensive_data)
+    
+    def _iter_workbook_sheets(self, excel_file: UploadedFile,
+                              sheet_names: Optional[List[str]] = None) -> Iterator[Tuple[str, Iterator[Tuple]]]:
+        """Yield ``(sheet name, row value tuples)`` for every sheet (or just ``sheet_names``), streaming from the file"""
+        if hasattr(excel_file, 'seek'):
+            excel_file.seek(0)
+        
+        backend = str(get_setting('EXCEL_READER_BACKEND') or DEFAULT_EXCEL_READER_BACKEND).lower()
+        if backend == 'calamine':
+            try:
+                from python_calamine import CalamineWorkbook, SheetTypeEnum
+            except ImportError:
+                logger.warning("python-calamine is not installed, falling back to openpyxl")
+            else:
+                workbook = CalamineWorkbook.from_filelike(excel_file)
+                # Chart, dialog and macro sheets hold no cells
+                worksheet_names = [sheet.name for sheet in workbook.sheets_metadata if sheet.typ == SheetTypeEnum.WorkSheet]
+                for sheet_name in sheet_names or worksheet_names:
+                    rows = workbook.get_sheet_by_name(sheet_name).iter_rows()
+                    yield sheet_name, (self._normalize_calamine_row(row) for row in rows)
+                return
+        
+        # read_only mode streams rows from the XML instead of building every cell object
+        workbook = load_workbook(excel_file, read_only=True, data_only=True)
         try:
-            sheet_type = None
-            sheet_name_lower = sheet_name.lower()
+            # worksheets, unlike sheetnames, leaves out chart sheets, which have no rows
+            for sheet_name in sheet_names or [worksheet.title for worksheet in workbook.worksheets]:
+                yield sheet_name, workbook[sheet_name].iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    
+    def _normalize_calamine_row(self, row: List[Any]) -> Tuple:
+        return tuple(self._normalize_calamine_cell(cell) for cell in row)
+    
+    def _normalize_calamine_cell(self, cell: Any) -> Any:
+        # Match openpyxl's values: empty cells are None, whole numbers are ints and dates are datetimes
+        if cell == "":
+            return None
+        if isinstance(cell, float) and cell.is_integer():
+            return int(cell)
+        if isinstance(cell, datetime.date) and not isinstance(cell, datetime.datetime):
+            return datetime.datetime.combine(cell, datetime.time())
+        return cell
+    
+    def _clean_row(self, row: Iterable[Any]) -> List[str]:
+        # Convert None values to empty strings and clean data
+        return [str(cell).strip() if cell is not None else "" for cell in row]
+    
+    def _analyze_sheet_rows(self, row_stream: Iterable[Tuple], sheet_name: str,
+                            keep_raw: bool = True) -> Tuple[Optional[List[List[str]]], str, TestCaseTable]:
+        """Collect raw data, detect the sheet type and extract test cases in one pass over the rows.
 
-            # Check content patterns
-            sheet_text = self._get_sheet_text_content(sheet)
+        Without ``keep_raw`` only the rows from the test case header on are held,
+        reading stops as soon as the sheet cannot hold test cases, and the raw
+        data is returned as None.
+        """
+        try:
+            rows = []
+            is_main_sheet = any(keyword in sheet_name.lower() for keyword in MAIN_SHEET_KEYWORDS)
+            found_headers = set()
+            header_row_idx = -1
+            
+            for idx, row in enumerate(row_stream):
+                if not keep_raw and (is_main_sheet or (idx >= HEADER_SCAN_ROWS and (header_row_idx == -1 or len(found_headers) < 2))):
+                    break
+                
+                clean_row = self._clean_row(row)
+                
+                # Stop looking for headers once both the sheet type and header row are known
+                detecting = header_row_idx == -1 or len(found_headers) < 2
+                if not is_main_sheet and detecting and idx < HEADER_SCAN_ROWS:
+                    row_text = ' '.join(cell.lower() for cell in clean_row if cell)
+                    found_headers.update(header for header in SHEET_TYPE_HEADERS if header in row_text)
+                    if header_row_idx == -1 and self._count_header_indicators(row_text) >= 2:
+                        header_row_idx = idx
+                
+                if keep_raw or header_row_idx != -1:
+                    rows.append(clean_row)
             
-            # Check sheet name patterns
-            if any(keyword in sheet_name_lower for keyword in ['statistic', 'summary', 'dashboard']):
+            if is_main_sheet:
                 sheet_type = 'main_sheet'
-            elif self._has_test_case_headers(sheet_text):
+            elif len(found_headers) >= 2:
                 sheet_type = 'test_cases'
             else:
                 sheet_type = 'unknown'
             
-            return sheet_type
+            test_cases = TestCaseTable()
+            if sheet_type == 'test_cases' and rows:
+                # Without raw data the held rows start at the header row
+                header_offset = header_row_idx if keep_raw else 0
+                test_cases = self._extract_test_cases_from_dataframe(pd.DataFrame(rows), header_offset)
             
+            return (rows if keep_raw else None), sheet_type, test_cases
         except Exception as e:
-            logger.error(f"Error identifying sheet type: {e}")
-            return 'unknown'
+            logger.error(f"Error analyzing sheet {sheet_name}: {e}")
+            return ([] if keep_raw else None), 'unknown', TestCaseTable()
     
-    def _get_sheet_text_content(self, sheet) -> str:
-        try:
-            text_content = ""
-            for row in sheet.iter_rows(values_only=True):
-                for cell in row:
-                    if cell is not None:
-                        text_content += str(cell) + " "
-            return text_content.lower()
-        except Exception as e:
-            logger.error(f"Error getting sheet text content: {e}")
-            return ""
+    def _count_header_indicators(self, row_text: str) -> int:
+        return sum(1 for indicator in HEADER_ROW_INDICATORS if indicator in row_text)
     
     def _has_test_case_headers(self, text: str) -> bool:
-        required_headers = ['use case', 'test scenario', 'priority']
-        return sum(1 for header in required_headers if header in text) >= 2
+        return sum(1 for header in SHEET_TYPE_HEADERS if header in text) >= 2
     
     def _identify_sections_in_sheet(self, rows: List[Tuple]) -> Dict[str, Dict[str, int]]:
         try:
             sections = {}
             
+            # Precompute where every section would end, so each header row is O(1)
+            section_breaks = self._section_breaks(rows)
+            
             for i, row in enumerate(rows):
-                row_text = ' '.join([str(cell).lower() if cell else '' for cell in row])
+                section = self._classify_section_row(_row_text(row))
                 
                 # Look for title/header section
-                if any(keyword in row_text for keyword in ['test execution report', 'test report', 'service']):
+                if section == 'title':
                     if 'title' not in sections:
                         sections['title'] = {'start': i, 'end': i + 3}
                 
                 # Look for statistics section
-                elif any(keyword in row_text for keyword in ['test execution statistics', 'statistics', 'p1 total tests']):
-                    sections['statistics'] = {'start': i, 'end': self._find_section_end(rows, i, 'statistics')}
+                elif section == 'statistics':
+                    sections['statistics'] = {'start': i, 'end': self._find_section_end(rows, i, 'statistics', section_breaks)}
                 
                 # Look for environment section
-                elif any(keyword in row_text for keyword in ['test environment', 'environment', 'test data details']):
-                    sections['environment'] = {'start': i, 'end': self._find_section_end(rows, i, 'environment')}
+                elif section == 'environment':
+                    sections['environment'] = {'start': i, 'end': self._find_section_end(rows, i, 'environment', section_breaks)}
                 
                 # Look for test cases section
-                elif any(keyword in row_text for keyword in ['detailed test cases', 'test cases', 'use case']):
+                elif section == 'test_cases':
                     if self._has_test_case_headers(' '.join([str(cell) for cell in row if cell])):
                         sections['test_cases'] = {'start': i, 'end': len(rows)}
             
@@ -166,25 +358,42 @@ class ExcelProcessor:
             logger.error(f"Error identifying sections: {e}")
             return {}
     
-    def _find_section_end(self, rows: List[Tuple], start: int, section_type: str) -> int:
+    def _classify_section_row(self, row_text: str) -> Optional[str]:
+        """Highest-priority section whose keywords appear in the row, using one regex scan"""
+        matched = {match.lastgroup for match in _SECTION_RE.finditer(row_text)}
+        return next((name for name, _ in SECTION_KEYWORDS if name in matched), None)
+    
+    def _section_breaks(self, rows: List[Tuple]) -> List[Optional[int]]:
+        """For each row index, the first row at or after it where a section ends.
+
+        A section ends at a row naming the next major section, or at the first
+        of three consecutive empty rows. Built with one forward pass to flag
+        rows and one backward sweep, so the lookup is linear in the sheet size.
+        """
+        row_count = len(rows)
+        is_empty = [not any(cell for cell in row if cell) for row in rows]
+        is_break = [
+            bool(_SECTION_BREAK_RE.search(_row_text(row)))
+            or (i < row_count - 2 and is_empty[i] and is_empty[i + 1] and is_empty[i + 2])
+            for i, row in enumerate(rows)
+        ]
+        
+        next_break: List[Optional[int]] = [None] * (row_count + 1)
+        for i in range(row_count - 1, -1, -1):
+            next_break[i] = i if is_break[i] else next_break[i + 1]
+        return next_break
+    
+    def _find_section_end(self, rows: List[Tuple], start: int, section_type: str,
+                          section_breaks: Optional[List[Optional[int]]] = None) -> int:
         """Find the end of a section"""
         try:
+            if section_breaks is None:
+                section_breaks = self._section_breaks(rows)
+            
             # Look for next major section or empty rows
-            for i in range(start + 1, len(rows)):
-                row_text = ' '.join([str(cell).lower() if cell else '' for cell in rows[i]])
-                
-                # Check for next major section
-                if any(keyword in row_text for keyword in ['detailed test cases', 'test environment', 'statistics']):
-                    return i
-                
-                # Check for multiple empty rows (section break)
-                if i < len(rows) - 2:
-                    next_rows_empty = all(
-                        not any(cell for cell in rows[j] if cell)
-                        for j in range(i, min(i + 3, len(rows)))
-                    )
-                    if next_rows_empty:
-                        return i
+            end = section_breaks[start + 1] if start + 1 < len(section_breaks) else None
+            if end is not None:
+                return end
             
             return min(start + 20, len(rows))  # Default section length
             
@@ -198,17 +407,15 @@ class ExcelProcessor:
             service_info = {}
             
             for row in rows:
-                row_text = ' '.join([str(cell) if cell else '' for cell in row])
+                row_text = _row_text(row)
                 
-                # Look for service name patterns
-                if 'test execution report' in row_text.lower():
-                    # Extract service name after "Test Execution Report -"
-                    match = re.search(r'test execution report\s*-\s*(.+)', row_text, re.IGNORECASE)
-                    if match:
-                        service_info['service_name'] = match.group(1).strip()
+                # Look for service name after "Test Execution Report -"
+                match = _SERVICE_NAME_RE.search(row_text)
+                if match:
+                    service_info['service_name'] = match.group(1).strip()
                 
                 # Look for service codes in brackets
-                bracket_match = re.search(r'\[([^\]]+)\]', row_text)
+                bracket_match = _SERVICE_CODE_RE.search(row_text)
                 if bracket_match:
                     service_info['service_code'] = bracket_match.group(1)
             
@@ -218,29 +425,11 @@ class ExcelProcessor:
             logger.error(f"Error extracting service info from rows: {e}")
             return {}
     
-    def _extract_test_cases_from_sheet(self, sheet) -> List[Dict[str, str]]:
-        """Extract test cases from a dedicated test cases sheet"""
-        try:
-            # Convert to DataFrame for easier processing
-            data = []
-            for row in sheet.iter_rows(values_only=True):
-                data.append([str(cell) if cell is not None else "" for cell in row])
-            
-            if not data:
-                return []
-            
-            df = pd.DataFrame(data)
-            return self._extract_test_cases_from_dataframe(df)
-            
-        except Exception as e:
-            logger.error(f"Error extracting test cases from sheet: {e}")
-            return []
-    
-    def _extract_test_cases_from_rows(self, rows: List[Tuple]) -> List[Dict[str, str]]:
+    def _extract_test_cases_from_rows(self, rows: List[Tuple]) -> TestCaseTable:
         """Extract test cases from rows"""
         try:
             if not rows:
-                return []
+                return TestCaseTable()
             
             # Convert to DataFrame
             data = [[str(cell) if cell is not None else "" for cell in row] for row in rows]
@@ -250,69 +439,68 @@ class ExcelProcessor:
             
         except Exception as e:
             logger.error(f"Error extracting test cases from rows: {e}")
-            return []
+            return TestCaseTable()
     
-    def _extract_test_cases_from_dataframe(self, df: pd.DataFrame) -> List[Dict[str, str]]:
+    def _extract_test_cases_from_dataframe(self, df: pd.DataFrame, header_row_idx: Optional[int] = None) -> TestCaseTable:
         """Extract test cases from DataFrame"""
         try:
-            test_cases = []
-            
-            # Find header row
-            header_row_idx = self._find_header_row(df)
+
+            # Find header row unless the caller already located it
+            if header_row_idx is None:
+                header_row_idx = self._find_header_row(df)
             if header_row_idx == -1:
                 logger.warning("Could not find header row in test cases")
-                return []
+                return TestCaseTable()
             
             # Extract headers
             headers = df.iloc[header_row_idx].tolist()
             headers = [str(h).strip() for h in headers if str(h).strip()]
             
             # Map headers to standard names
-            mapped_headers = []
-            for header in headers:
-                clean_header = header.lower().strip()
-                mapped_header = self.column_mappings.get(clean_header, header)
-                mapped_headers.append(mapped_header)
-            
-            # Extract test case rows
-            for idx in range(header_row_idx + 1, len(df)):
-                row = df.iloc[idx].tolist()
-                
-                # Skip empty rows
-                if not any(str(cell).strip() for cell in row if cell):
-                    continue
-                
-                # Create test case dictionary
-                test_case = {}
-                for i, (header, value) in enumerate(zip(mapped_headers, row)):
-                    if header and i < len(row):
-                        clean_value = str(value).strip() if value else ""
-                        test_case[header] = clean_value
-                        
-                # Only add if it has essential fields
-                if (test_case.get('Use Case') or test_case.get('Test Scenario')) and test_case.get('Priority'):
-                    test_cases.append(test_case)
-
-            return test_cases
+            mapped_headers = [self.header_index.get(normalize_header(header), header) for header in headers]
+            
+            # Header names pair positionally with the leading columns; for a repeated
+            # name keep its first position in the column order but the last column's values
+            last_position = {}
+            for position, header in enumerate(mapped_headers):
+                last_position[header] = position
+            
+            data = df.iloc[header_row_idx + 1:, [last_position[header] for header in last_position]]
+            data.columns = list(last_position)
+            
+            # Clean whitespace column by column
+            data = data.fillna('').astype(str).apply(lambda column: column.str.strip())
+            
+            # Only keep rows that have essential fields (this also drops empty rows)
+            def has_value(column_name: str) -> pd.Series:
+                if column_name not in data.columns:
+                    return pd.Series(False, index=data.index)
+                return data[column_name] != ''
+            
+            essential = (has_value('Use Case') | has_value('Test Scenario')) & has_value('Priority')
+            return TestCaseTable.from_dataframe(data[essential])
             
         except Exception as e:
             logger.error(f"Error extracting test cases from DataFrame: {e}")
-            return []
+            return TestCaseTable()
     
     def _find_header_row(self, df: pd.DataFrame) -> int:
         """Find the row containing test case headers"""
         try:
-            for idx, row in df.iterrows():
-                row_text = ' '.join([str(cell).lower() for cell in row if cell])
-                
-                # Check for test case headers
-                header_indicators = ['use case', 'test scenario', 'priority', 'expected result']
-                matches = sum(1 for indicator in header_indicators if indicator in row_text)
-                
-                if matches >= 2:  # At least 2 header indicators
-                    return idx
+            head = df.head(HEADER_SCAN_ROWS).reset_index(drop=True)
             
-            return -1
+            # Join the non-empty cells of each row into one lowercase string
+            cells = head.where(head.notna(), '').astype(str).stack(future_stack=True)
+            cells = cells[cells != '']
+            if cells.empty:
+                return -1
+            row_text = cells.groupby(level=0).agg(' '.join).str.lower()
+            
+            # Check for test case headers, at least 2 header indicators
+            matches = sum(row_text.str.contains(indicator, regex=False).astype(int) for indicator in HEADER_ROW_INDICATORS)
+            header_rows = matches.index[matches >= 2]
+            
+            return int(header_rows.min()) if len(header_rows) else -1
             
         except Exception as e:
             logger.error(f"Error finding header row: {e}")
@@ -323,24 +511,19 @@ class ExcelProcessor:
         try:
             # Clean test cases
             if 'test_cases' in data:
-                cleaned_cases = []
-                for tc in data['test_cases']:
-                    cleaned_tc = {}
-                    for key, value in tc.items():
-                        # Clean value
-                        if isinstance(value, str):
-                            cleaned_value = re.sub(r'\s+', ' ', value.strip())
-                            cleaned_value = cleaned_value.replace('\n', ' ').replace('\r', '')
-                        else:
-                            cleaned_value = str(value) if value else ""
-                        
-                        cleaned_tc[key] = cleaned_value
-                    
-                    # Only keep test cases with essential information
-                    if cleaned_tc.get('Use Case') or cleaned_tc.get('Test Scenario'):
-                        cleaned_cases.append(cleaned_tc)
+                test_cases = data['test_cases']
+                if not isinstance(test_cases, TestCaseTable):
+                    test_cases = TestCaseTable.from_records(test_cases)
+                
+                # Clean values column by column
+                test_cases.map_values(normalize_cell_text)
+                
+                # Only keep test cases with essential information
+                use_cases = test_cases.column('Use Case')
+                scenarios = test_cases.column('Test Scenario')
+                test_cases.filter_rows([bool(use_case or scenario) for use_case, scenario in zip(use_cases, scenarios)])
                 
-                data['test_cases'] = cleaned_cases
+                data['test_cases'] = test_cases
             
             # Ensure all required fields exist
             if 'service_info' not in data:
@@ -359,7 +542,7 @@ class ExcelProcessor:
     def extract_text_representation(self, excel_file: UploadedFile) -> str:
         """Extract text representation of Excel file for embedding"""
         try:
-            comprehensive_data = self.extract_comprehensive_data_from_excel(excel_file)
+            comprehensive_data = self.extract_comprehensive_data_from_excel(excel_file, lazy_raw_sheets=True, as_table=True)
             
             text_parts = []
             
@@ -380,18 +563,205 @@ class ExcelProcessor:
                 text_parts.append("")
             
             # Add test cases
-            test_cases = comprehensive_data.get('test_cases', [])
+            test_cases = comprehensive_data.get('test_cases', TestCaseTable())
             if test_cases:
                 text_parts.append("TEST CASES:")
-                for i, tc in enumerate(test_cases, 1):
-                    text_parts.append(f"Test Case {i}:")
-                    for key, value in tc.items():
-                        if value:
-                            text_parts.append(f"  {key}: {value}")
+                for i, row_items in enumerate(test_cases.iter_row_items(), 1):
+                    text_parts.extend(self._test_case_lines(i, row_items))
                     text_parts.append("")
             
             return "\n".join(text_parts)
             
         except Exception as e:
             logger.error(f"Error extracting text representation: {e}")
-            return ""
\ No newline at end of file
+            return ""
+    
+    def iter_text_chunks(self, excel_file: UploadedFile, max_size: int = DEFAULT_TEXT_CHUNK_CHARS,
+                         measure: Callable[[str], int] = len) -> Iterator[TextChunk]:
+        """Stream the test cases' text representation as chunks no bigger than ``max_size``.
+
+        Sizes are measured with ``measure`` (characters by default; pass a token
+        counter to bound chunks by the embedding model's context). Test cases are
+        formatted as in ``extract_text_representation`` and packed whole into
+        chunks straight from the row stream, so embedding can start before the
+        workbook is fully parsed. A test case that does not fit is split on line,
+        then word, boundaries. Read errors propagate to the caller.
+        """
+        max_size = max(1, int(max_size))
+        number = 0
+        for sheet_name, row_stream in self._iter_workbook_sheets(excel_file):
+            chunk_id, blocks = None, []
+            for row_idx, row_items in self._iter_sheet_test_cases(row_stream, sheet_name):
+                number += 1
+                block = "\n".join(self._test_case_lines(number, row_items))
+                block_id = f"{sheet_name}!{row_idx + 1}"
+                
+                if blocks and measure("\n\n".join([*blocks, block])) > max_size:
+                    yield TextChunk(chunk_id, "\n\n".join(blocks))
+                    chunk_id, blocks = None, []
+                
+                if measure(block) > max_size:
+                    for part, text in enumerate(self._split_text(block, max_size, measure), 1):
+                        yield TextChunk(f"{block_id}#{part}", text)
+                    continue
+                
+                if not blocks:
+                    chunk_id = block_id
+                blocks.append(block)
+            
+            if blocks:
+                yield TextChunk(chunk_id, "\n\n".join(blocks))
+    
+    def _test_case_lines(self, number: int, row_items: Iterable[Tuple[str, str]]) -> List[str]:
+        lines = [f"Test Case {number}:"]
+        lines.extend(f"  {key}: {value}" for key, value in row_items if value)
+        return lines
+    
+    def _split_text(self, text: str, max_size: int, measure: Callable[[str], int]) -> Iterator[str]:
+        # Over-long lines are broken into words first, then lines are packed greedily
+        lines = []
+        for line in text.split("\n"):
+            if measure(line) > max_size:
+                lines.extend(self._pack(line.split(" "), " ", max_size, measure))
+            else:
+                lines.append(line)
+        return self._pack(lines, "\n", max_size, measure)
+    
+    def _pack(self, parts: Iterable[str], separator: str, max_size: int, measure: Callable[[str], int]) -> Iterator[str]:
+        # Greedily join parts while they fit; a single over-long part becomes its own piece
+        group = []
+        for part in parts:
+            if group and measure(separator.join([*group, part])) > max_size:
+                yield separator.join(group)
+                group = []
+            group.append(part)
+        if group:
+            yield separator.join(group)
+    
+    def _iter_sheet_test_cases(self, row_stream: Iterable[Tuple], sheet_name: str) -> Iterator[Tuple[int, List[Tuple[str, str]]]]:
+        """Yield ``(row index, (column, value) pairs)`` for each valid test case of a sheet, row by row.
+
+        Applies the same sheet detection, header mapping, essential-field check
+        and cleaning as ``_analyze_sheet_rows`` plus ``_clean_and_validate_data``,
+        holding only the rows read while the sheet type is still undecided.
+        """
+        if any(keyword in sheet_name.lower() for keyword in MAIN_SHEET_KEYWORDS):
+            return
+        
+        rows = iter(row_stream)
+        found_headers = set()
+        header_row_idx = -1
+        buffered = []
+        for idx, row in enumerate(rows):
+            if idx >= HEADER_SCAN_ROWS:
+                return
+            clean_row = self._clean_row(row)
+            row_text = ' '.join(cell.lower() for cell in clean_row if cell)
+            found_headers.update(header for header in SHEET_TYPE_HEADERS if header in row_text)
+            if header_row_idx == -1 and self._count_header_indicators(row_text) >= 2:
+                header_row_idx = idx
+            if header_row_idx != -1:
+                buffered.append(clean_row)
+                if len(found_headers) >= 2:
+                    break
+        else:
+            return
+        
+        # Header names pair positionally with the leading columns; last repeated name wins
+        mapped_headers = [self.header_index.get(normalize_header(header), header) for header in buffered[0] if header]
+        last_position = {}
+        for position, header in enumerate(mapped_headers):
+            last_position[header] = position
+        columns = list(last_position)
+        positions = list(last_position.values())
+        
+        data_rows = itertools.chain(buffered[1:], (self._clean_row(row) for row in rows))
+        for row_idx, row in enumerate(data_rows, header_row_idx + 1):
+            item = dict(zip(columns, (row[position] if position < len(row) else '' for position in positions)))
+            if not ((item.get('Use Case') or item.get('Test Scenario')) and item.get('Priority')):
+                continue
+            
+            item = {column: normalize_cell_text(value) for column, value in item.items()}
+            if item.get('Use Case') or item.get('Test Scenario'):
+                yield row_idx, list(item.items())
+
+
+class RawSheetsData(Mapping):
+    """Read-only ``raw_sheets_data`` mapping that loads a sheet on first access.
+
+    The workbook bytes are copied at construction, so the mapping outlives the
+    request's upload. Each sheet is re-read from them in streaming mode and
+    cleaned exactly as during extraction, then cached.
+    """
+
+    def __init__(self, processor: 'ExcelProcessor', source: Any, sheet_names: List[str]):
+        if not isinstance(source, bytes):
+            if hasattr(source, 'seek'):
+                source.seek(0)
+            source = source.read()
+        self._processor = processor
+        self._data = source
+        self._sheet_names = list(sheet_names)
+        self._loaded: Dict[str, List[List[str]]] = {}
+
+    def __getitem__(self, sheet_name: str) -> List[List[str]]:
+        if sheet_name not in self._sheet_names:
+            raise KeyError(sheet_name)
+        if sheet_name not in self._loaded:
+            self._loaded[sheet_name] = self._read_sheet(sheet_name)
+        return self._loaded[sheet_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sheet_names)
+
+    def __len__(self) -> int:
+        return len(self._sheet_names)
+
+    def _read_sheet(self, sheet_name: str) -> List[List[str]]:
+        try:
+            for _, row_stream in self._processor._iter_workbook_sheets(io.BytesIO(self._data), [sheet_name]):
+                return [self._processor._clean_row(row) for row in row_stream]
+        except Exception as e:
+            logger.error(f"Error reading raw data of sheet {sheet_name}: {e}")
+            raise
+        raise KeyError(sheet_name)
+
+
+def _analyze_workbook_sheets(data: bytes, keep_raw: bool = True) -> List[Tuple[str, Optional[List[List[str]]], str, TestCaseTable]]:
+    """Process-pool entry point: analyze every sheet of a workbook held in memory"""
+    processor = ExcelProcessor()
+    return [
+        (sheet_name, *processor._analyze_sheet_rows(row_stream, sheet_name, keep_raw))
+        for sheet_name, row_stream in processor._iter_workbook_sheets(io.BytesIO(data))
+    ]
+
+
+_ingestion_pool: Optional[ProcessPoolExecutor] = None
+_ingestion_pool_lock = threading.Lock()
+
+
+def get_ingestion_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every request in this process, created on first use.
+
+    Sized by the EXCEL_INGESTION_WORKERS setting.
+    """
+    global _ingestion_pool
+    with _ingestion_pool_lock:
+        if _ingestion_pool is None:
+            workers = max(1, int(get_setting('EXCEL_INGESTION_WORKERS') or DEFAULT_INGESTION_WORKERS))
+            _ingestion_pool = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context(INGESTION_MP_CONTEXT))
+        return _ingestion_pool
+
+
+def reset_ingestion_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """Shut the shared pool down (e.g. after a worker died) so the next call starts a fresh one.
+
+    With ``pool`` given, only reset if it is still the shared pool.
+    """
+    global _ingestion_pool
+    with _ingestion_pool_lock:
+        if _ingestion_pool is None or (pool is not None and pool is not _ingestion_pool):
+            return
+        pool, _ingestion_pool = _ingestion_pool, None
+    pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,163 @@
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import BinaryIO, Callable, List, Optional, Tuple
+import logging
+
+from .config import get_setting
+
+logger = logging.getLogger(__name__)
+
+GENERATED_FILES_DIR = "files"
+GENERATED_IMAGES_DIR = "images"
+
+# Retention policy for generated files: anything older than the max age is removed, then
+# the oldest files go until the directory fits the size budget
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Sweeps run at most this often per process
+DEFAULT_SWEEP_INTERVAL_SECONDS = 10 * 60
+# Files younger than this are never swept, so in-progress writes and fresh exports survive
+SWEEP_GRACE_SECONDS = 60
+
+TEMP_PREFIX = '.tmp-'
+_FILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+def new_file_id() -> str:
+    """Unique job ID used to name a generated file"""
+    return uuid.uuid4().hex
+
+
+def is_valid_file_id(file_id: str) -> bool:
+    return bool(_FILE_ID_RE.match(file_id or ''))
+
+
+class GeneratedFileStore:
+    """Directory of generated files addressed by job ID.
+
+    Files are written to a temporary file in the same directory and renamed
+    into place, so concurrent requests (threads or workers) never see or
+    clobber each other's partial output.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        # Resolved per call, like the paths the generators used before
+        return self._directory or os.path.join(os.getcwd(), GENERATED_FILES_DIR)
+
+    def path_for(self, file_id: str, suffix: str) -> str:
+        if not is_valid_file_id(file_id):
+            raise ValueError(f"Invalid file ID: {file_id!r}")
+        return os.path.join(self.directory, f"{file_id}{suffix}")
+
+    def write_atomic(self, file_id: str, suffix: str, write: Callable[[BinaryIO], None]) -> str:
+        """Create ``<file_id><suffix>`` by calling ``write`` on a temporary file, then renaming it"""
+        path = self.path_for(file_id, suffix)
+        os.makedirs(self.directory, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX, suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                write(temp_file)
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return path
+
+    def find(self, file_id: str) -> Optional[str]:
+        """Path of the finished file stored under ``file_id``, if any"""
+        if not is_valid_file_id(file_id):
+            return None
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and os.path.splitext(entry.name)[0] == file_id:
+                    return entry.path
+        except FileNotFoundError:
+            pass
+        return None
+
+
+def sweep_directory(directory: str, max_age_seconds: float, max_bytes: int, now: Optional[float] = None) -> int:
+    """Delete files under ``directory`` past the age limit, then oldest first down to ``max_bytes``.
+
+    Returns the number of files removed. Files younger than SWEEP_GRACE_SECONDS are kept.
+    """
+    now = time.time() if now is None else now
+    files: List[Tuple[float, int, str]] = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    files.sort()
+    total_bytes = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        age = now - mtime
+        if age < SWEEP_GRACE_SECONDS:
+            break
+        if age <= max_age_seconds and total_bytes <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing generated file {path}: {e}")
+            continue
+        total_bytes -= size
+    return removed
+
+
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def sweep_generated_files(force: bool = False) -> int:
+    """Apply the retention policy to the generated files and images directories.
+
+    Cheap to call on every request: unless ``force``d it runs at most once per
+    GENERATED_FILES_SWEEP_INTERVAL seconds per process.
+    """
+    global _last_sweep
+    interval = float(get_setting('GENERATED_FILES_SWEEP_INTERVAL') or DEFAULT_SWEEP_INTERVAL_SECONDS)
+    with _sweep_lock:
+        now = time.time()
+        if not force and now - _last_sweep < interval:
+            return 0
+        _last_sweep = now
+
+    max_age = float(get_setting('GENERATED_FILES_MAX_AGE') or DEFAULT_MAX_AGE_SECONDS)
+    max_bytes = int(get_setting('GENERATED_FILES_MAX_BYTES') or DEFAULT_MAX_BYTES)
+    removed = 0
+    for name in (GENERATED_FILES_DIR, GENERATED_IMAGES_DIR):
+        directory = os.path.join(os.getcwd(), name)
+        if os.path.isdir(directory):
+            try:
+                removed += sweep_directory(directory, max_age, max_bytes, now)
+            except Exception as e:
+                logger.error(f"Error sweeping {directory}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} expired generated files")
+    return removed
+
+
+export_store = GeneratedFileStore()
@@ -0,0 +1,193 @@
+import math
+import threading
+from collections import defaultdict
+from typing import Any, Iterator, List, Sequence, Tuple, Union
+import logging
+
+import cv2
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+CONTRAST_FACTOR = 2.0
+SHARPNESS_FACTOR = 1.5
+BLUR_SIGMA = 0.5
+CLAHE_CLIP_LIMIT = 2.0
+CLAHE_TILE_GRID = (8, 8)
+
+# Resolution policy: OCR input is resampled to at most OCR_TARGET_DPI and capped at
+# OCR_MAX_PIXELS, then split into overlapping tiles so EasyOCR memory stays bounded
+OCR_TARGET_DPI = 150
+OCR_MAX_PIXELS = 24_000_000
+OCR_TILE_SIZE = 2048
+OCR_TILE_OVERLAP = 128
+# CLIP resizes to 224px anyway, so decode no larger than twice that on the short side
+CLIP_DECODE_SIZE = 448
+
+# PIL's ImageFilter.SMOOTH kernel, used by ImageEnhance.Sharpness as the degenerate image
+_SMOOTH_KERNEL = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13.0
+
+_local = threading.local()
+
+
+def _get_clahe():
+    # CLAHE objects hold internal state, so each thread reuses its own instance
+    clahe = getattr(_local, 'clahe', None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+        _local.clahe = clahe
+    return clahe
+
+
+def to_rgb_array(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """Return a writable, contiguous uint8 RGB buffer, copying only when needed"""
+    if isinstance(image, Image.Image):
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return np.array(image)
+
+    if image.ndim == 2:
+        return cv2.cvtColor(image.astype(np.uint8, copy=False), cv2.COLOR_GRAY2RGB)
+    if image.ndim == 3 and image.shape[2] == 4:
+        return cv2.cvtColor(image.astype(np.uint8, copy=False), cv2.COLOR_RGBA2RGB)
+
+    array = np.ascontiguousarray(image, dtype=np.uint8)
+    if not array.flags.writeable:
+        array = array.copy()
+    return array
+
+
+def enhance_for_clip(rgb: np.ndarray) -> np.ndarray:
+    """Grayscale, contrast, sharpen and lightly blur an RGB buffer for CLIP.
+
+    Mirrors the former PIL chain (convert('L'), ImageEnhance.Contrast(2.0),
+    ImageEnhance.Sharpness(1.5), GaussianBlur(0.5), convert('RGB')) using one
+    grayscale working buffer and writing the result back into ``rgb``.
+    """
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+
+    # Contrast: blend towards the mean grey level, as ImageEnhance.Contrast does
+    mean = int(cv2.mean(gray)[0] + 0.5)
+    cv2.addWeighted(gray, CONTRAST_FACTOR, gray, 0.0, mean * (1.0 - CONTRAST_FACTOR), dst=gray)
+
+    # Sharpness: blend away from PIL's SMOOTH-filtered image
+    smooth = cv2.filter2D(gray, -1, _SMOOTH_KERNEL, borderType=cv2.BORDER_REPLICATE)
+    cv2.addWeighted(gray, SHARPNESS_FACTOR, smooth, 1.0 - SHARPNESS_FACTOR, 0.0, dst=gray)
+
+    # Slight gaussian blur to smooth out noise
+    cv2.GaussianBlur(gray, (0, 0), BLUR_SIGMA, dst=gray)
+
+    cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB, dst=rgb)
+    return rgb
+
+
+def enhance_for_ocr(rgb: np.ndarray) -> np.ndarray:
+    """Apply CLAHE to the lightness channel of an RGB buffer, in place, for EasyOCR"""
+    lab = cv2.cvtColor(rgb, cv2.COLOR_RGB2LAB)
+    lightness = cv2.extractChannel(lab, 0)
+    _get_clahe().apply(lightness, dst=lightness)
+    cv2.insertChannel(lightness, lab, 0)
+    cv2.cvtColor(lab, cv2.COLOR_LAB2RGB, dst=rgb)
+    return rgb
+
+
+def ocr_scale(image: Image.Image) -> float:
+    """Scale factor that brings an image to the OCR target DPI and pixel budget"""
+    scale = 1.0
+    dpi = image.info.get('dpi')
+    try:
+        source_dpi = float(dpi[0]) if dpi else 0.0
+    except (TypeError, ValueError, IndexError):
+        source_dpi = 0.0
+    if source_dpi > OCR_TARGET_DPI:
+        scale = OCR_TARGET_DPI / source_dpi
+
+    width, height = image.size
+    pixels = width * height * scale * scale
+    if pixels > OCR_MAX_PIXELS:
+        scale *= math.sqrt(OCR_MAX_PIXELS / pixels)
+    return scale
+
+
+def downscale(image: Image.Image, scale: float) -> Image.Image:
+    """Shrink an image by ``scale`` as cheaply as possible.
+
+    JPEGs are decoded at reduced size via ``draft``; large integer factors use
+    ``reduce`` and only the remainder goes through a full resample.
+    """
+    if scale >= 1.0:
+        return image
+
+    target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    image.draft('RGB', target)
+    factor = min(image.width // target[0], image.height // target[1])
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != target:
+        image = image.resize(target, Image.LANCZOS)
+    return image
+
+
+def load_for_clip(image: Image.Image) -> Image.Image:
+    """Decode an image no larger than CLIP needs, keeping the short side >= CLIP_DECODE_SIZE"""
+    short_side = min(image.size)
+    if short_side <= CLIP_DECODE_SIZE:
+        return image
+    return downscale(image, CLIP_DECODE_SIZE / short_side)
+
+
+def iter_tiles(array: np.ndarray, tile_size: int = OCR_TILE_SIZE,
+               overlap: int = OCR_TILE_OVERLAP) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Yield ``(x, y, tile)`` views covering the array with overlapping tiles"""
+    height, width = array.shape[:2]
+    if height <= tile_size and width <= tile_size:
+        yield 0, 0, array
+        return
+
+    step = tile_size - overlap
+    for y in range(0, max(height - overlap, 1), step):
+        for x in range(0, max(width - overlap, 1), step):
+            yield x, y, np.ascontiguousarray(array[y:y + tile_size, x:x + tile_size])
+
+
+def _box_bounds(box: Sequence[Sequence[float]]) -> Tuple[float, float, float, float]:
+    xs = [point[0] for point in box]
+    ys = [point[1] for point in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _mostly_overlaps(a: Tuple[float, float, float, float], b: Tuple[float, float, float, float]) -> bool:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return False
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return smaller > 0 and width * height / smaller > 0.5
+
+
+def merge_tile_results(tile_results: List[Tuple[int, int, List[Any]]], scale: float = 1.0) -> List[Any]:
+    """Merge per-tile EasyOCR results into one list in original image coordinates.
+
+    Boxes are shifted by their tile offset and divided by ``scale``; the same
+    text read twice in an overlap strip is kept once, at the higher confidence.
+    """
+    merged = []
+    for x_offset, y_offset, results in tile_results:
+        for bbox, text, confidence in results:
+            box = [[round((float(px) + x_offset) / scale), round((float(py) + y_offset) / scale)] for px, py in bbox]
+            merged.append((box, text, float(confidence)))
+
+    if len(tile_results) > 1:
+        kept_by_text = defaultdict(list)
+        deduplicated = []
+        for result in sorted(merged, key=lambda r: -r[2]):
+            bounds = _box_bounds(result[0])
+            seen = kept_by_text[result[1].strip().lower()]
+            if any(_mostly_overlaps(bounds, other) for other in seen):
+                continue
+            seen.append(bounds)
+            deduplicated.append(result)
+        # Reading order across tiles: top to bottom, then left to right
+        merged = sorted(deduplicated, key=lambda r: (r[0][0][1], r[0][0][0]))
+    return merged
@@ -1,236 +1,374 @@
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image
 import torch
-from transformers import CLIPProcessor, CLIPModel
 import numpy as np
+import io
 import os
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-import cv2
 import re
-from collections import defaultdict
-import easyocr
+from .model_registry import model_registry, get_inference_backend, CLIP_MODEL_NAME
+from .runtime_tuning import get_ocr_batch_size
+from .embedding_cache import get_embedding_cache, EmbeddingCache, hash_bytes, hash_file, hash_text
+from .ocr_cache import ocr_cache, OcrCache, OcrResult
+from .image_pipeline import (
+    to_rgb_array, enhance_for_clip, enhance_for_ocr, ocr_scale, downscale, load_for_clip,
+    iter_tiles, merge_tile_results, OCR_TARGET_DPI, OCR_MAX_PIXELS, OCR_TILE_SIZE, OCR_TILE_OVERLAP
+)
+from .workflow_text_matcher import workflow_text_matcher, WORKFLOW_KEYWORDS
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EMBEDDING_BATCH_SIZE = 16
+
+# Bump whenever image enhancement or tokenization changes so cached embeddings are not reused
+PREPROCESSING_VERSION = "3"
+
+# Describes _prepare_ocr_image and _run_ocr; part of the OCR cache key
+OCR_PREPROCESSING_PARAMS = (
+    f"rgb-clahe-2.0-8x8-dpi{OCR_TARGET_DPI}-px{OCR_MAX_PIXELS}-tile{OCR_TILE_SIZE}-{OCR_TILE_OVERLAP}"
+)
+
+DEFAULT_EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)
+
 class ImageProcessor:
     def __init__(self):
-        self.model_name = "openai/clip-vit-base-patch32"
+        self.model_name = CLIP_MODEL_NAME
+        self.inference_backend = get_inference_backend()
+        self.loaded_backend = None
         self.processor = None
-        self.reader = easyocr.Reader(['en'])
         self.model = None
+        self._reader = None
+        self.ocr_batch_size = get_ocr_batch_size()
+        self.embedding_cache = get_embedding_cache()
         self.load_model()
         
         # Workflow-specific keywords and patterns
-        self.workflow_keywords = {
-            'actions': ['apply', 'login', 'payment', 'approve', 'decline', 'submit', 'confirm', 'receive', 'send'],
-            'actors': ['applicant', 'officer', 'user', 'system', 'admin', 'citizen', 'irembogov engine'],
-            'decision_words': ['successful', 'approved', 'declined', 'yes', 'no', 'decision'],
-            'notification_words': ['notification', 'email', 'sms', 'message', 'alert'],
-            'process_words': ['start', 'end', 'stop', 'begin', 'finish', 'process']
-        }
+        self.workflow_keywords = WORKFLOW_KEYWORDS
+        self.text_matcher = workflow_text_matcher
     
+    @property
+    def reader(self):
+        """EasyOCR reader shared across the worker process, loaded on first OCR call"""
+        if self._reader is None:
+            self._reader = model_registry.get_ocr_reader()
+        return self._reader
+
+    @property
+    def _embedding_model_id(self) -> str:
+        # Backends produce slightly different vectors, so they never share cache entries;
+        # key on the backend actually loaded, which is fp32 torch after a fallback
+        return f"{self.model_name}@{self.loaded_backend or self.inference_backend}"
+
     def load_model(self):
-        """Load CLIP model for image embeddings"""
+        """Load CLIP model for image embeddings from the shared model registry"""
         try:
-            self.processor = CLIPProcessor.from_pretrained(self.model_name)
-            self.model = CLIPModel.from_pretrained(self.model_name)
-            logger.info("CLIP model loaded successfully for image processing")
+            self.processor, self.model = model_registry.get_clip(self.model_name, self.inference_backend)
+            self.loaded_backend = model_registry.get_clip_backend(self.model_name, self.inference_backend)
+            if self.model is not None:
+                logger.info("CLIP model ready for image processing")
         except Exception as e:
             logger.error(f"Error loading CLIP model: {e}")
 
     def extract_workflow_info_from_image(self, image_path: Path) -> Dict[str, Any]:
         """Extract comprehensive workflow information from diagram images"""
         try:
-            image = Image.open(image_path)
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+            image = Image.open(io.BytesIO(image_bytes))
             
-            # Extract text using OCR
-            extracted_text = self._extract_text_with_ocr(image)
+            # Extract text using OCR, reusing earlier results for the same image content
+            extracted_text = self._extract_text_with_ocr(image, image_hash=hash_bytes(image_bytes))
 
-            # Analyze workflow structure
-            workflow_analysis = self._analyze_workflow_structure(extracted_text)
-            
-            # Detect workflow elements
-            workflow_elements = self._detect_workflow_elements(extracted_text)
-            
-            # Extract actors and roles
-            actors_and_roles = self._extract_actors_and_roles(extracted_text)
-            
-            # Identify process steps
-            process_steps = self._identify_process_steps(extracted_text)
-            
-            # Detect decision points
-            decision_points = self._detect_decision_points(extracted_text)
-            
-            # Extract notifications
-            notifications = self._extract_notifications_from_image(extracted_text)
-            
-            comprehensive_info = {
-                'image_type': "Work flow diagram",
-                'extracted_text': extracted_text,
-                'workflow_analysis': workflow_analysis,
-                'workflow_elements': workflow_elements,
-                'actors_and_roles': actors_and_roles,
-                'process_steps': process_steps,
-                'decision_points': decision_points,
-                'notifications': notifications
-                # 'test_scenarios': self._generate_test_scenarios_from_workflow(workflow_elements, process_steps, decision_points)
-            }
-            
-            return comprehensive_info
+            return self._build_workflow_info(extracted_text)
         except Exception as e:
             logger.error(f"Error extracting workflow info from image {image_path}: {e}")
             raise
     
+    def extract_workflow_info_from_images(self, image_paths: List[Path],
+                                          workers: int = DEFAULT_EXTRACTION_WORKERS) -> Iterator[Tuple[Path, Optional[Dict[str, Any]]]]:
+        """Extract workflow information from many diagrams, yielding ``(path, info)`` as each completes.
+
+        Reading, hashing and OCR preprocessing run on a pool of ``workers``
+        threads while a single inference thread owns the EasyOCR reader. At most
+        ``2 * workers`` images are in flight, bounding memory. Images that fail
+        are logged and yielded with ``None`` instead of aborting the batch.
+        """
+        image_paths = list(image_paths)
+        workers = max(1, int(workers))
+        max_in_flight = 2 * workers
+        results: "queue.Queue[Tuple[Path, Optional[Dict[str, Any]]]]" = queue.Queue()
+        
+        def analyze(image_path: Path, prepared: Future):
+            try:
+                cache_key, ocr_results, prepared_image = prepared.result()
+                if ocr_results is None:
+                    ocr_results = self._run_ocr(prepared_image, cache_key)
+                info = self._build_workflow_info(self._text_from_ocr_results(ocr_results))
+            except Exception as e:
+                logger.error(f"Error extracting workflow info from image {image_path}: {e}")
+                info = None
+            results.put((image_path, info))
+        
+        decode_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-decode")
+        inference_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-inference")
+        try:
+            submitted = 0
+            for completed in range(len(image_paths)):
+                while submitted < len(image_paths) and submitted - completed < max_in_flight:
+                    image_path = image_paths[submitted]
+                    prepared = decode_pool.submit(self._prepare_ocr_input, image_path)
+                    prepared.add_done_callback(lambda f, p=image_path: inference_pool.submit(analyze, p, f))
+                    submitted += 1
+                yield results.get()
+        finally:
+            decode_pool.shutdown(wait=True, cancel_futures=True)
+            inference_pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _build_workflow_info(self, extracted_text: str) -> Dict[str, Any]:
+        # Analyze structure, elements, actors, steps, decisions and notifications in one pass
+        text_analysis = self.text_matcher.analyze(extracted_text)
+        
+        return {
+            'image_type': "Work flow diagram",
+            'extracted_text': extracted_text,
+            **text_analysis
+            # 'test_scenarios': self._generate_test_scenarios_from_workflow(workflow_elements, process_steps, decision_points)
+        }
+    
     def generate_image_embedding(self, image_path: Path) -> Optional[List[float]]:
         """Generate embedding for an image with enhanced preprocessing"""
+        embeddings = self.generate_image_embeddings([image_path], batch_size=1)
+        if embeddings is None or not embeddings[0].any():
+            return None
+        return embeddings[0].tolist()
+    
+    def generate_image_embeddings(self, image_paths: List[Path], batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE) -> Optional[np.ndarray]:
+        """Generate normalized CLIP embeddings for many images as one float32 matrix.
+
+        Images are loaded, enhanced and run through ``get_image_features`` in
+        batches of ``batch_size``. Row ``i`` corresponds to ``image_paths[i]``;
+        images that cannot be loaded are logged and left as zero rows.
+        """
         try:
             if not self.model or not self.processor:
                 logger.error("CLIP model not loaded")
                 return None
             
-            # Load and enhance image
-            image = Image.open(image_path).convert('RGB')
-            
-            # Enhance image for better processing
-            enhanced_image = self._enhance_image_for_ocr(image)
-            
-            # Process image with CLIP
-            inputs = self.processor(images=enhanced_image, return_tensors="pt")
-            
-            # Generate embedding
-            with torch.no_grad():
-                image_features = self.model.get_image_features(**inputs)
-                # Normalize the features
-                image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+            batch_size = max(1, int(batch_size))
+            embeddings = np.zeros((len(image_paths), self.model.config.projection_dim), dtype=np.float32)
+            
+            # Serve identical images from the cache and only embed the rest
+            pending = []
+            for idx, image_path in enumerate(image_paths):
+                try:
+                    cache_key = EmbeddingCache.make_key(self._embedding_model_id, PREPROCESSING_VERSION, hash_file(image_path))
+                except Exception as e:
+                    logger.error(f"Error hashing image {image_path} for embedding: {e}")
+                    continue
+                cached = self.embedding_cache.get(cache_key)
+                if cached is not None:
+                    embeddings[idx] = cached
+                else:
+                    pending.append((idx, cache_key))
+            
+            for start in range(0, len(pending), batch_size):
+                batch_indices = []
+                batch_keys = []
+                batch_images = []
+                for idx, cache_key in pending[start:start + batch_size]:
+                    try:
+                        # Load and enhance image for better processing
+                        with Image.open(image_paths[idx]) as image:
+                            batch_images.append(self._enhance_image_for_ocr(load_for_clip(image)))
+                        batch_indices.append(idx)
+                        batch_keys.append(cache_key)
+                    except Exception as e:
+                        logger.error(f"Error loading image {image_paths[idx]} for embedding: {e}")
+                
+                if not batch_images:
+                    continue
+                
+                # Process the whole batch with CLIP in a single forward pass
+                inputs = self.processor(images=batch_images, return_tensors="pt")
+                with torch.no_grad():
+                    image_features = self.model.get_image_features(**inputs)
+                    # Normalize the features
+                    image_features = image_features / image_features.norm(dim=-1, keepdim=True)
+                
+                batch_embeddings = image_features.cpu().numpy().astype(np.float32, copy=False)
+                embeddings[batch_indices] = batch_embeddings
+                self.embedding_cache.set_many(dict(zip(batch_keys, batch_embeddings)))
             
-            return image_features.squeeze().tolist()
+            return embeddings
         except Exception as e:
-            logger.error(f"Error generating image embedding for {image_path}: {e}")
+            logger.error(f"Error generating image embeddings: {e}")
             return None
     
     def generate_text_image_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding for text using CLIP (for text-image similarity)"""
+        embeddings = self.generate_text_image_embeddings([text], batch_size=1)
+        if embeddings is None:
+            return None
+        return embeddings[0].tolist()
+    
+    @property
+    def max_text_tokens(self) -> int:
+        """Longest text, in CLIP tokens including the start/end tokens, that is embedded without truncation"""
+        return self.model.config.text_config.max_position_embeddings
+    
+    def count_text_tokens(self, text: str) -> int:
+        """Number of CLIP tokens ``text`` encodes to, including the start/end tokens"""
+        return len(self.processor.tokenizer(text)['input_ids'])
+    
+    def generate_text_image_embeddings(self, texts: List[str], batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
+                                       sort_by_length: bool = True) -> Optional[np.ndarray]:
+        """Generate normalized CLIP text embeddings for many strings as one float32 matrix.
+
+        Each batch is padded once and encoded with a single ``get_text_features``
+        call. With ``sort_by_length`` the strings are bucketed by length so each
+        batch pads to a similar size; rows are always returned in input order.
+        """
         try:
             if not self.model or not self.processor:
                 logger.error("CLIP model not loaded")
                 return None
             
-            # Process text
-            inputs = self.processor(text=[text], return_tensors="pt", padding=True)
+            batch_size = max(1, int(batch_size))
+            embeddings = np.zeros((len(texts), self.model.config.projection_dim), dtype=np.float32)
             
-            # Generate embedding
-            with torch.no_grad():
-                text_features = self.model.get_text_features(**inputs)
-                # Normalize the features
-                text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+            # Serve identical texts from the cache and only encode the rest
+            pending = []
+            for idx, text in enumerate(texts):
+                cache_key = EmbeddingCache.make_key(self._embedding_model_id, PREPROCESSING_VERSION, hash_text(text))
+                cached = self.embedding_cache.get(cache_key)
+                if cached is not None:
+                    embeddings[idx] = cached
+                else:
+                    pending.append((idx, cache_key))
+            
+            if sort_by_length:
+                pending.sort(key=lambda item: len(texts[item[0]]))
+            
+            for start in range(0, len(pending), batch_size):
+                batch_indices = [idx for idx, _ in pending[start:start + batch_size]]
+                batch_keys = [cache_key for _, cache_key in pending[start:start + batch_size]]
+                
+                # Process text, padding the batch once
+                inputs = self.processor(text=[texts[idx] for idx in batch_indices], return_tensors="pt",
+                                        padding=True, truncation=True)
+                
+                # Generate embedding
+                with torch.no_grad():
+                    text_features = self.model.get_text_features(**inputs)
+                    # Normalize the features
+                    text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+                
+                batch_embeddings = text_features.cpu().numpy().astype(np.float32, copy=False)
+                embeddings[batch_indices] = batch_embeddings
+                self.embedding_cache.set_many(dict(zip(batch_keys, batch_embeddings)))
             
-            return text_features.squeeze().tolist()
+            return embeddings
         except Exception as e:
-            logger.error(f"Error generating text-image embedding: {e}")
+            logger.error(f"Error generating text-image embeddings: {e}")
             return None
     
-    
-    def _enhance_image_for_ocr(self, image: Image.Image) -> Image.Image:
+    def _enhance_image_for_ocr(self, image: Image.Image) -> np.ndarray:
         """Enhance image quality for better OCR results"""
+        rgb = to_rgb_array(image)
         try:
-            # Convert to grayscale for better OCR
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(2.0)
-            
-            # Enhance sharpness
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(1.5)
-            
-            # Apply slight gaussian blur to smooth out noise
-            image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
-            
-            # Convert back to RGB for CLIP
-            return image.convert('RGB')
+            return enhance_for_clip(rgb)
         except Exception as e:
             logger.error(f"Error enhancing image: {e}")
-            return image
+            return rgb
     
-    def _extract_text_with_ocr(self, image: Image.Image) -> str:
+    def _extract_text_with_ocr(self, image: Image.Image, image_hash: Optional[str] = None) -> str:
         try:
-            image_array = np.array(image.convert('RGB'))
-            
-            # Apply preprocessing for better OCR results
-            processed_image = self._preprocess_image_for_easy_ocr(image_array)
-           
-            ocr_results = self.reader.readtext(processed_image)
-            
-            # Extract text from results with confidence filtering
-            extracted_texts = []
-            for result in ocr_results:
-                if len(result) >= 3:
-                    bbox, text, confidence = result
-                    # Only include text with reasonable confidence (>0.5)
-                    if confidence > 0.5 and text.strip():
-                        extracted_texts.append(text.strip())
-            
-            # Join all extracted text
-            full_text = ' '.join(extracted_texts)
-            
-            # Clean and normalize the text
-            cleaned_text = self._clean_extracted_text(full_text)
-            
-            logger.info(f"EasyOCR extracted {len(extracted_texts)} text segments with confidence > 0.5")
-            return cleaned_text
-
+            ocr_results = self._read_text_regions(image, image_hash)
+            return self._text_from_ocr_results(ocr_results)
         except Exception as e:
             logger.error(f"Error extracting text with OCR: {e}")
             return ""
+    
+    def _text_from_ocr_results(self, ocr_results: List[OcrResult]) -> str:
+        # Extract text from results with confidence filtering
+        extracted_texts = []
+        for result in ocr_results:
+            if len(result) >= 3:
+                bbox, text, confidence = result
+                # Only include text with reasonable confidence (>0.5)
+                if confidence > 0.5 and text.strip():
+                    extracted_texts.append(text.strip())
         
+        # Join all extracted text
+        full_text = ' '.join(extracted_texts)
+        
+        # Clean and normalize the text
+        cleaned_text = self._clean_extracted_text(full_text)
+        
+        logger.info(f"EasyOCR extracted {len(extracted_texts)} text segments with confidence > 0.5")
+        return cleaned_text
+        
+    def _read_text_regions(self, image: Image.Image, image_hash: Optional[str] = None) -> List[OcrResult]:
+        """Run EasyOCR on an image, caching the raw boxes, texts and confidences by content hash"""
+        cache_key = OcrCache.make_key(image_hash, OCR_PREPROCESSING_PARAMS) if image_hash else None
+        if cache_key:
+            cached = ocr_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return self._run_ocr(self._prepare_ocr_image(image), cache_key)
+    
+    def _prepare_ocr_input(self, image_path: Path) -> Tuple[str, Optional[List[OcrResult]], Optional[Tuple[np.ndarray, float]]]:
+        """Read and hash an image, returning cached OCR results or the preprocessed image to OCR"""
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        cache_key = OcrCache.make_key(hash_bytes(image_bytes), OCR_PREPROCESSING_PARAMS)
+        
+        cached = ocr_cache.get(cache_key)
+        if cached is not None:
+            return cache_key, cached, None
+        
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            return cache_key, None, self._prepare_ocr_image(image)
+    
+    def _prepare_ocr_image(self, image: Image.Image) -> Tuple[np.ndarray, float]:
+        """Downscale to the OCR resolution policy and preprocess; returns the array and its scale"""
+        scale = ocr_scale(image)
+        image = downscale(image, scale)
+        
+        # Apply preprocessing for better OCR results on a single RGB buffer
+        return self._preprocess_image_for_easy_ocr(to_rgb_array(image)), scale
+    
+    def _run_ocr(self, prepared: Tuple[np.ndarray, float], cache_key: Optional[str] = None) -> List[OcrResult]:
+        """OCR a prepared image tile by tile, returning boxes in original image coordinates"""
+        processed_image, scale = prepared
+        tile_results = [
+            (x, y, self.reader.readtext(tile, batch_size=self.ocr_batch_size)) for x, y, tile in iter_tiles(processed_image)
+        ]
+        ocr_results = merge_tile_results(tile_results, scale)
+        
+        if cache_key:
+            ocr_cache.set(cache_key, ocr_results)
+        return ocr_results
+    
     def _preprocess_image_for_easy_ocr(self, image_array: np.ndarray) -> np.ndarray:
         """Preprocess image specifically for EasyOCR"""
+        # Validate input
+        if image_array is None or image_array.size == 0:
+            raise ValueError("Invalid image array")
+        
+        # EasyOCR expects RGB and handles most preprocessing internally
+        processed = to_rgb_array(image_array)
+        
+        # Apply slight contrast enhancement in place
         try:
-            # Validate input
-            if image_array is None or image_array.size == 0:
-                raise ValueError("Invalid image array")
-            
-            # EasyOCR handles preprocessing internally, so we do minimal processing
-            
-            # Ensure RGB format (EasyOCR expects RGB)
-            if len(image_array.shape) == 3 and image_array.shape[2] == 3:
-                # Already RGB, just ensure proper data type
-                processed = image_array.astype(np.uint8)
-            else:
-                # Convert grayscale to RGB if needed
-                if len(image_array.shape) == 2:
-                    processed = cv2.cvtColor(image_array, cv2.COLOR_GRAY2RGB)
-                else:
-                    processed = image_array.astype(np.uint8)
-            
-            # Optional: Apply slight contrast enhancement
-            try:
-                # Convert to LAB color space for better contrast enhancement
-                lab = cv2.cvtColor(processed, cv2.COLOR_RGB2LAB)
-                l, a, b = cv2.split(lab)
-                
-                # Apply CLAHE to L channel
-                clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-                l = clahe.apply(l)
-                
-                # Merge channels and convert back to RGB
-                enhanced = cv2.merge([l, a, b])
-                processed = cv2.cvtColor(enhanced, cv2.COLOR_LAB2RGB)
-            except Exception as e:
-                logger.warning(f"Contrast enhancement failed: {e}, using original")
-                # Keep original processed image
-            
-            return processed
-            
+            return enhance_for_ocr(processed)
         except Exception as e:
-            logger.error(f"Error preprocessing image for EasyOCR: {e}")
-            # Return original image if preprocessing fails
-            if len(image_array.shape) == 2:
-                return cv2.cvtColor(image_array, cv2.COLOR_GRAY2RGB)
-            return image_array.astype(np.uint8)
+            logger.warning(f"Contrast enhancement failed: {e}, using original")
+            return processed
     
     def _clean_extracted_text(self, text: str) -> str:
         """Clean and normalize OCR extracted text"""
@@ -256,17 +394,7 @@ class ImageProcessor:
     def _analyze_workflow_structure(self, text: str) -> Dict[str, Any]:
         """Analyze the overall structure of the workflow"""
         try:
-            text_lower = text.lower()
-            
-            analysis = {
-                'has_swimlanes': any(keyword in text_lower for keyword in ['applicant', 'officer', 'system', 'engine']),
-                'has_decision_points': any(keyword in text_lower for keyword in ['yes', 'no', 'successful', 'approved', 'declined']),
-                'has_notifications': any(keyword in text_lower for keyword in ['notification', 'email', 'sms', 'message']),
-                'has_payment_flow': any(keyword in text_lower for keyword in ['payment', 'bill id']),
-                'has_approval_process': any(keyword in text_lower for keyword in ['approve', 'approval', 'confirm'])
-            }
-            
-            return analysis
+            return self.text_matcher.analyze_structure(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error analyzing workflow structure: {e}")
             return {}
@@ -274,32 +402,7 @@ class ImageProcessor:
     def _detect_workflow_elements(self, text: str) -> Dict[str, List[str]]:
         """Detect different types of workflow elements"""
         try:
-            text_lower = text.lower()
-            elements = defaultdict(list)
-            
-            # Detect actions/processes
-            for keyword in self.workflow_keywords['actions']:
-                if keyword in text_lower:
-                    # Extract context around the keyword
-                    context = self._extract_context_around_keyword(text, keyword)
-                    if context:
-                        elements['actions'].append(context)
-            
-            # Detect actors/roles
-            for keyword in self.workflow_keywords['actors']:
-                if keyword in text_lower:
-                    context = self._extract_context_around_keyword(text, keyword)
-                    if context:
-                        elements['actors'].append(context)
-            
-            # Detect decisions
-            for keyword in self.workflow_keywords['decision_words']:
-                if keyword in text_lower:
-                    context = self._extract_context_around_keyword(text, keyword)
-                    if context:
-                        elements['decisions'].append(context)
-            
-            return dict(elements)
+            return self.text_matcher.detect_elements(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error detecting workflow elements: {e}")
             return {}
@@ -307,17 +410,7 @@ class ImageProcessor:
     def _extract_context_around_keyword(self, text: str, keyword: str, context_window: int = 10) -> str:
         """Extract context around a keyword"""
         try:
-            words = text.split()
-            keyword_indices = [i for i, word in enumerate(words) if keyword.lower() in word.lower()]
-            
-            contexts = []
-            for idx in keyword_indices:
-                start = max(0, idx - context_window)
-                end = min(len(words), idx + context_window + 1)
-                context = ' '.join(words[start:end])
-                contexts.append(context)
-            
-            return ' | '.join(contexts) if contexts else ""
+            return self.text_matcher.index(text).context(keyword, context_window)
         except Exception as e:
             logger.error(f"Error extracting context around keyword {keyword}: {e}")
             return ""
@@ -325,30 +418,7 @@ class ImageProcessor:
     def _extract_actors_and_roles(self, text: str) -> List[Dict[str, str]]:
         """Extract actors and their roles from the workflow"""
         try:
-            actors = []
-            text_lower = text.lower()
-            
-            # Common actor patterns in workflows
-            actor_patterns = [
-                (r'district\s+applicant', 'District Applicant'),
-                (r'rab\s+officer', 'RAB Officer'),
-                (r'applicant', 'Applicant'),
-                (r'officer', 'Officer'),
-                (r'user', 'User'),
-                (r'citizen', 'Citizen'),
-                (r'system', 'System'),
-                (r'engine', 'System Engine')
-            ]
-            
-            for pattern, role_name in actor_patterns:
-                if re.search(pattern, text_lower):
-                    actors.append({
-                        'name': role_name,
-                        'type': 'human' if role_name not in ['System', 'System Engine'] else 'system',
-                        'context': self._extract_context_around_keyword(text, role_name.split()[0])
-                    })
-            
-            return actors
+            return self.text_matcher.extract_actors(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error extracting actors and roles: {e}")
             return []
@@ -356,30 +426,7 @@ class ImageProcessor:
     def _identify_process_steps(self, text: str) -> List[Dict[str, str]]:
         """Identify individual process steps"""
         try:
-            steps = []
-            
-            # Look for action words that indicate process steps
-            action_patterns = [
-                r'login\s+to\s+(?:the\s+)?portal',
-                r'apply\s+for\s+[\w\s]+',
-                r'make\s+payment',
-                r'receive\s+notification',
-                r'confirm\s+[\w\s]+',
-                r'approve\s+[\w\s]*',
-                r'decline\s+[\w\s]*',
-                r'send\s+notification'
-            ]
-            
-            for i, pattern in enumerate(action_patterns):
-                matches = re.findall(pattern, text.lower())
-                for match in matches:
-                    steps.append({
-                        'step_number': str(i + 1),
-                        'action': match.title(),
-                        'type': 'user_action' if any(word in match for word in ['login', 'apply', 'make']) else 'system_action'
-                    })
-            
-            return steps
+            return self.text_matcher.identify_steps(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error identifying process steps: {e}")
             return []
@@ -387,27 +434,7 @@ class ImageProcessor:
     def _detect_decision_points(self, text: str) -> List[Dict[str, str]]:
         """Detect decision points in the workflow"""
         try:
-            decisions = []
-            text_lower = text.lower()
-            
-            # Decision patterns
-            decision_patterns = [
-                r'is\s+payment\s+successful',
-                r'approved\s+or\s+decline',
-                r'yes\s+or\s+no',
-                r'successful\s+\?'
-            ]
-            
-            for pattern in decision_patterns:
-                matches = re.findall(pattern, text_lower)
-                for match in matches:
-                    decisions.append({
-                        'decision_text': match.title(),
-                        'type': 'binary_decision',
-                        'possible_outcomes': self._extract_decision_outcomes(text, match)
-                    })
-            
-            return decisions
+            return self.text_matcher.detect_decisions(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error detecting decision points: {e}")
             return []
@@ -415,23 +442,7 @@ class ImageProcessor:
     def _extract_decision_outcomes(self, text: str, decision_text: str) -> List[str]:
         """Extract possible outcomes for a decision"""
         try:
-            # Look for yes/no, approve/decline, etc.
-            outcomes = []
-            text_lower = text.lower()
-            
-            common_outcomes = [
-                ['yes', 'no'],
-                ['approved', 'declined'],
-                ['successful', 'failed'],
-                ['accept', 'reject']
-            ]
-            
-            for outcome_pair in common_outcomes:
-                if all(outcome in text_lower for outcome in outcome_pair):
-                    outcomes.extend(outcome_pair)
-                    break
-            
-            return list(set(outcomes))
+            return self.text_matcher.decision_outcomes(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error extracting decision outcomes: {e}")
             return []
@@ -439,27 +450,7 @@ class ImageProcessor:
     def _extract_notifications_from_image(self, text: str) -> List[Dict[str, str]]:
         """Extract notification-related information"""
         try:
-            notifications = []
-            text_lower = text.lower()
-            
-            # Notification patterns
-            notification_patterns = [
-                r'user\s+receives\s+email\s+notification',
-                r'notification\s+is\s+sent',
-                r'email\s+notification\s+for\s+[\w\s]+',
-                r'sms\s+notification'
-            ]
-            
-            for pattern in notification_patterns:
-                matches = re.findall(pattern, text_lower)
-                for match in matches:
-                    notifications.append({
-                        'type': 'email' if 'email' in match else 'sms' if 'sms' in match else 'general',
-                        'description': match.title(),
-                        'trigger': self._extract_notification_trigger(text, match)
-                    })
-            
-            return notifications
+            return self.text_matcher.extract_notifications(self.text_matcher.index(text))
         except Exception as e:
             logger.error(f"Error extracting notifications: {e}")
             return []
@@ -467,18 +458,7 @@ class ImageProcessor:
     def _extract_notification_trigger(self, text: str, notification_text: str) -> str:
         """Extract what triggers a notification"""
         try:
-            # Look for context before the notification
-            words = text.lower().split()
-            notification_words = notification_text.split()
-            
-            for i, word in enumerate(words):
-                if notification_words[0] in word:
-                    # Look at previous context
-                    start = max(0, i - 5)
-                    trigger_context = ' '.join(words[start:i])
-                    return trigger_context.title()
-            
-            return "Unknown trigger"
+            return self.text_matcher.notification_trigger(self.text_matcher.index(text), notification_text)
         except Exception as e:
             logger.error(f"Error extracting notification trigger: {e}")
             return "Unknown trigger"
@@ -0,0 +1,106 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+from .clip_backends import load_clip_backend, BACKEND_TORCH
+from .config import get_setting
+from .runtime_tuning import apply_runtime_tuning
+
+logger = logging.getLogger(__name__)
+
+CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
+OCR_LANGUAGES = ('en',)
+
+
+def get_inference_backend() -> str:
+    """CLIP inference backend selected by the CLIP_INFERENCE_BACKEND setting"""
+    return str(get_setting('CLIP_INFERENCE_BACKEND') or BACKEND_TORCH).lower()
+
+
+class ModelRegistry:
+    """Process-wide holder for the heavy image models.
+
+    Each worker process loads the CLIP model/processor and the EasyOCR reader
+    at most once, on first use (or eagerly from the gunicorn ``post_fork``
+    hook), and every ImageProcessor instance shares the same handles.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._clip: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self._clip_backends: Dict[Tuple[str, str], str] = {}
+        self._ocr_readers: Dict[Tuple[str, ...], Any] = {}
+
+    def get_clip(self, model_name: str = CLIP_MODEL_NAME, backend: Optional[str] = None) -> Tuple[Optional[Any], Optional[Any]]:
+        """Return the shared ``(processor, model)`` pair for a backend, loading it on first use"""
+        key = (model_name, backend or get_inference_backend())
+        handles = self._clip.get(key)
+        if handles is not None:
+            return handles
+
+        with self._lock:
+            handles = self._clip.get(key)
+            if handles is None:
+                apply_runtime_tuning()
+                processor, model, loaded_backend = self._load_clip(*key)
+                handles = (processor, model)
+                # Only cache successful loads so a transient failure can be retried
+                if model is not None:
+                    self._clip[key] = handles
+                    self._clip_backends[key] = loaded_backend
+            return handles
+
+    def get_clip_backend(self, model_name: str = CLIP_MODEL_NAME, backend: Optional[str] = None) -> Optional[str]:
+        """Backend actually serving ``get_clip(model_name, backend)``, which is fp32 torch after a fallback"""
+        return self._clip_backends.get((model_name, backend or get_inference_backend()))
+
+    def get_ocr_reader(self, languages: Tuple[str, ...] = OCR_LANGUAGES) -> Optional[Any]:
+        """Return the shared EasyOCR reader, loading it on first use"""
+        key = tuple(languages)
+        reader = self._ocr_readers.get(key)
+        if reader is not None:
+            return reader
+
+        with self._lock:
+            reader = self._ocr_readers.get(key)
+            if reader is None:
+                apply_runtime_tuning()
+                reader = self._load_ocr_reader(key)
+                if reader is not None:
+                    self._ocr_readers[key] = reader
+            return reader
+
+    def warm_up(self):
+        """Eagerly load every model, e.g. from gunicorn's post_fork hook"""
+        self.get_clip()
+        self.get_ocr_reader()
+
+    def clear(self):
+        """Drop all loaded models so they are reloaded on next use"""
+        with self._lock:
+            self._clip.clear()
+            self._clip_backends.clear()
+            self._ocr_readers.clear()
+
+    def _load_clip(self, model_name: str, backend: str) -> Tuple[Optional[Any], Optional[Any], Optional[str]]:
+        try:
+            processor, model, loaded_backend = load_clip_backend(model_name, backend)
+            logger.info(f"CLIP model {model_name} ({loaded_backend}) loaded into shared registry")
+            return processor, model, loaded_backend
+        except Exception as e:
+            logger.error(f"Error loading CLIP model: {e}")
+            return None, None, None
+
+    def _load_ocr_reader(self, languages: Tuple[str, ...]) -> Optional[Any]:
+        try:
+            import easyocr
+
+            reader = easyocr.Reader(list(languages))
+            logger.info(f"EasyOCR reader for {list(languages)} loaded into shared registry")
+            return reader
+        except Exception as e:
+            logger.error(f"Error loading EasyOCR reader: {e}")
+            return None
+
+
+model_registry = ModelRegistry()
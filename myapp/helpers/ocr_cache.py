@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+# (bounding box, text, confidence) exactly as returned by EasyOCR's readtext
+OcrResult = Tuple[Any, str, float]
+
+
+class OcrCache:
+    """In-process LRU cache of raw EasyOCR results.
+
+    Entries are keyed by the image content hash plus the preprocessing
+    parameters, so the summary, the structured analysis and any later
+    re-analysis of the same image share a single OCR pass.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[OcrResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def make_key(image_hash: str, preprocessing_params: str) -> str:
+        return f"{preprocessing_params}:{image_hash}"
+
+    def get(self, key: str) -> Optional[List[OcrResult]]:
+        with self._lock:
+            results = self._entries.get(key)
+            if results is None:
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return results
+
+    def set(self, key: str, results: List[OcrResult]):
+        with self._lock:
+            self._entries[key] = list(results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ocr_cache = OcrCache()
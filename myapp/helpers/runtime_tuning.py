@@ -0,0 +1,90 @@
+import os
+import threading
+from typing import Any, Dict
+import logging
+
+from .config import get_setting
+
+logger = logging.getLogger(__name__)
+
+AUTO = 'auto'
+DEFAULT_OCR_BATCH_SIZE = 1
+
+_applied: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Number of worker processes sharing this host (IMAGE_WORKER_COUNT, else gunicorn's WEB_CONCURRENCY)"""
+    value = get_setting('IMAGE_WORKER_COUNT') or os.environ.get('WEB_CONCURRENCY') or 1
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def resolve_thread_count(value: Any, default: Any = AUTO) -> int:
+    """Turn a thread setting into a count; ``auto`` divides the host's cores across workers"""
+    value = default if value in (None, '') else value
+    if str(value).lower() == AUTO:
+        return max(1, (os.cpu_count() or 1) // worker_count())
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid thread count {value!r}, using auto")
+        return resolve_thread_count(AUTO)
+
+
+def get_ocr_batch_size() -> int:
+    try:
+        return max(1, int(get_setting('EASYOCR_BATCH_SIZE') or DEFAULT_OCR_BATCH_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_OCR_BATCH_SIZE
+
+
+def apply_runtime_tuning() -> Dict[str, Any]:
+    """Configure torch and OpenCV thread pools for this worker, once per process.
+
+    Called when the first model is loaded so every gunicorn worker uses its
+    share of the cores instead of all of them.
+    """
+    if _applied:
+        return _applied
+
+    with _lock:
+        if _applied:
+            return _applied
+
+        intra_op = resolve_thread_count(get_setting('IMAGE_TORCH_THREADS'))
+        inter_op = resolve_thread_count(get_setting('IMAGE_TORCH_INTEROP_THREADS'), default=1)
+        opencv_threads = resolve_thread_count(get_setting('IMAGE_OPENCV_THREADS'), default=1)
+        tuning = {
+            'torch_threads': intra_op,
+            'torch_interop_threads': inter_op,
+            'opencv_threads': opencv_threads,
+            'ocr_batch_size': get_ocr_batch_size(),
+            'workers': worker_count()
+        }
+
+        try:
+            import torch
+
+            torch.set_num_threads(intra_op)
+            try:
+                torch.set_num_interop_threads(inter_op)
+            except RuntimeError as e:
+                # Only allowed before any inter-op parallel work has started in this process
+                logger.warning(f"Could not set torch inter-op threads: {e}")
+        except Exception as e:
+            logger.error(f"Error applying torch thread settings: {e}")
+
+        try:
+            import cv2
+
+            cv2.setNumThreads(opencv_threads)
+        except Exception as e:
+            logger.error(f"Error applying OpenCV thread settings: {e}")
+
+        logger.info(f"Image runtime tuning applied: {tuning}")
+        _applied.update(tuning)
+        return _applied
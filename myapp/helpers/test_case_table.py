@@ -0,0 +1,201 @@
+import sys
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Low-cardinality columns stored as small integer codes into a category list
+CATEGORICAL_COLUMNS = ('Priority', 'Test Result')
+
+
+class TestCaseTable:
+    """Compact columnar store for extracted test cases.
+
+    Values are kept per column instead of one dict per row: text columns hold
+    interned strings and Priority/Test Result hold 32-bit category codes.
+    Rows remember which sheet layout (column order) they came from, so
+    iterating yields the same dicts, with the same key order, that row-by-row
+    extraction produced. Cells a row's layout does not have are absent, not
+    empty.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, Any] = {}
+        self._categories: Dict[str, List[Optional[str]]] = {}
+        self._category_codes: Dict[str, Dict[Optional[str], int]] = {}
+        self._layouts: List[Tuple[str, ...]] = []
+        self._layout_ids: Dict[Tuple[str, ...], int] = {}
+        self._row_layouts = array('H')
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'TestCaseTable':
+        table = cls()
+        table.append_dataframe(df)
+        return table
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'TestCaseTable':
+        """Build a table from row dicts, e.g. generated test cases"""
+        table = cls()
+        for record in records:
+            table.append_rows(list(record.keys()), [list(record.values())])
+        return table
+
+    def __len__(self) -> int:
+        return len(self._row_layouts)
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for idx in range(len(self)):
+            yield self.row(idx)
+
+    def __getitem__(self, idx: int) -> Dict[str, str]:
+        return self.row(idx)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TestCaseTable):
+            return self.to_dicts() == other.to_dicts()
+        if isinstance(other, list):
+            return self.to_dicts() == other
+        return NotImplemented
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def append_dataframe(self, df: pd.DataFrame):
+        columns = [str(column) for column in df.columns]
+        self._append_columns(columns, [df[column].tolist() for column in df.columns], len(df))
+
+    def append_rows(self, columns: Sequence[str], rows: Sequence[Sequence[Any]]):
+        """Append rows that share one column layout"""
+        values = [[row[position] for row in rows] for position in range(len(columns))]
+        self._append_columns(list(columns), values, len(rows))
+
+    def extend(self, other: 'TestCaseTable'):
+        for layout in other._layouts:
+            self._layout_id(layout)
+        for column in other._columns:
+            self._ensure_column(column)
+
+        for column in self._columns:
+            values = other.column(column) if column in other._columns else [None] * len(other)
+            self._extend_column(column, values)
+        self._row_layouts.extend(self._layout_id(other._layouts[layout_id]) for layout_id in other._row_layouts)
+
+    def row(self, idx: int) -> Dict[str, str]:
+        return dict(self.row_items(idx))
+
+    def row_items(self, idx: int) -> List[Tuple[str, str]]:
+        """``(column, value)`` pairs of one row in its original column order"""
+        return [(column, self._value(column, idx)) for column in self._layouts[self._row_layouts[idx]]]
+
+    def iter_row_items(self) -> Iterator[List[Tuple[str, str]]]:
+        for idx in range(len(self)):
+            yield self.row_items(idx)
+
+    def iter_rows(self, columns: Sequence[str], defaults: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Any, ...]]:
+        """Yield value tuples for ``columns``; cells a row does not have take ``defaults`` (else '')"""
+        defaults = defaults or {}
+        decoded = []
+        for column in columns:
+            default = defaults.get(column, '')
+            if column not in self._columns:
+                decoded.append([default] * len(self))
+            else:
+                decoded.append([default if value is None else value for value in self.column(column)])
+        if not decoded:
+            return iter([()] * len(self))
+        return zip(*decoded)
+
+    def column(self, name: str) -> List[Optional[str]]:
+        """Decoded values of a column, with None where a row has no such cell"""
+        if name not in self._columns:
+            return [None] * len(self)
+        if name in self._categories:
+            categories = self._categories[name]
+            return [categories[code] for code in self._columns[name]]
+        return list(self._columns[name])
+
+    def count_value(self, column: str, value: str) -> int:
+        if column not in self._columns:
+            return 0
+        if column in self._categories:
+            code = self._category_codes[column].get(value)
+            return 0 if code is None else self._columns[column].count(code)
+        return self._columns[column].count(value)
+
+    def map_values(self, func: Callable[[str], str]):
+        """Apply ``func`` to every present cell, column by column"""
+        for column in list(self._columns):
+            if column in self._categories:
+                # Only the categories need mapping; merge categories that collapse together
+                values = [None if value is None else func(value) for value in self.column(column)]
+                self._categories[column] = [None]
+                self._category_codes[column] = {None: 0}
+                self._columns[column] = array('I')
+                self._extend_column(column, values)
+            else:
+                self._columns[column] = [None if value is None else sys.intern(func(value)) for value in self._columns[column]]
+
+    def filter_rows(self, keep: Sequence[bool]):
+        """Keep only the rows whose flag in ``keep`` is true"""
+        for column, values in self._columns.items():
+            kept = [value for value, flag in zip(values, keep) if flag]
+            self._columns[column] = array('I', kept) if column in self._categories else kept
+        self._row_layouts = array('H', (layout for layout, flag in zip(self._row_layouts, keep) if flag))
+
+    def to_dicts(self) -> List[Dict[str, str]]:
+        return list(self)
+
+    def _value(self, column: str, idx: int) -> Optional[str]:
+        value = self._columns[column][idx]
+        if column in self._categories:
+            return self._categories[column][value]
+        return value
+
+    def _append_columns(self, columns: List[str], values: List[List[Any]], row_count: int):
+        # Repeated names keep their first position but the last column's values, like dict assignment
+        layout = tuple(dict.fromkeys(columns))
+        by_name = dict(zip(columns, values))
+        layout_id = self._layout_id(layout)
+
+        for column in layout:
+            self._ensure_column(column)
+        for column in self._columns:
+            self._extend_column(column, by_name[column] if column in by_name else [None] * row_count)
+        self._row_layouts.extend([layout_id] * row_count)
+
+    def _layout_id(self, layout: Tuple[str, ...]) -> int:
+        layout_id = self._layout_ids.get(layout)
+        if layout_id is None:
+            layout_id = len(self._layouts)
+            self._layouts.append(layout)
+            self._layout_ids[layout] = layout_id
+        return layout_id
+
+    def _ensure_column(self, column: str):
+        if column in self._columns:
+            return
+        if column in CATEGORICAL_COLUMNS:
+            self._categories[column] = [None]
+            self._category_codes[column] = {None: 0}
+            self._columns[column] = array('I', bytes(4 * len(self)))
+        else:
+            self._columns[column] = [None] * len(self)
+
+    def _extend_column(self, column: str, values: Iterable[Any]):
+        if column in self._categories:
+            categories = self._categories[column]
+            codes = self._category_codes[column]
+            encoded = array('I')
+            for value in values:
+                value = None if value is None else str(value)
+                code = codes.get(value)
+                if code is None:
+                    code = len(categories)
+                    categories.append(value)
+                    codes[value] = code
+                encoded.append(code)
+            self._columns[column].extend(encoded)
+        else:
+            self._columns[column].extend(None if value is None else sys.intern(str(value)) for value in values)
@@ -0,0 +1,157 @@
+import csv
+import functools
+import io
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+
+import orjson
+
+from .excel_generator import (
+    ExcelGenerator, XLSX_CONTENT_TYPE, TESTCASE_HEADERS, TESTCASE_EXECUTION_PADDING, iter_test_case_values
+)
+from .generated_files import export_store, new_file_id, sweep_generated_files
+from .test_case_table import TestCaseTable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPORT_FORMAT = 'xlsx'
+# Column layout of the machine-readable formats: the service, then the test case sheet's columns
+EXPORT_COLUMNS = ['Service', *TESTCASE_HEADERS]
+# Rows encoded per write (JSON Lines) or per row group (Parquet)
+EXPORT_BATCH_ROWS = 5000
+
+TestCaseSource = Union[Iterable[Dict], TestCaseTable]
+
+
+def iter_export_rows(test_cases: TestCaseSource, service_name: str) -> Iterator[Tuple]:
+    """Rows of EXPORT_COLUMNS values, matching the cells of the generated workbook"""
+    for source_values in iter_test_case_values(test_cases):
+        yield (service_name, *source_values, *TESTCASE_EXECUTION_PADDING)
+
+
+def _iter_batches(rows: Iterator[Tuple], size: int = EXPORT_BATCH_ROWS) -> Iterator[List[Tuple]]:
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+class TestCaseExporter(ABC):
+    """Writes test cases (with the same inputs as ``generate_testcase_excel``) to a binary stream"""
+
+    name = ''
+    suffix = ''
+    content_type = 'application/octet-stream'
+
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def write(self, test_cases: TestCaseSource, service_name: str, destination: BinaryIO):
+        ...
+
+
+class XlsxExporter(TestCaseExporter):
+    """Styled workbook, via the streaming ExcelGenerator engine"""
+
+    name = 'xlsx'
+    suffix = '.xlsx'
+    content_type = XLSX_CONTENT_TYPE
+
+    def write(self, test_cases: TestCaseSource, service_name: str, destination: BinaryIO):
+        ExcelGenerator().write_testcase_workbook(test_cases, service_name, destination)
+
+
+class CsvExporter(TestCaseExporter):
+    name = 'csv'
+    suffix = '.csv'
+    content_type = 'text/csv'
+
+    def write(self, test_cases: TestCaseSource, service_name: str, destination: BinaryIO):
+        text = io.TextIOWrapper(destination, encoding='utf-8', newline='')
+        try:
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            writer.writerows(iter_export_rows(test_cases, service_name))
+            text.flush()
+        finally:
+            # Leave the destination open for the caller
+            text.detach()
+
+
+class JsonLinesExporter(TestCaseExporter):
+    name = 'jsonl'
+    suffix = '.jsonl'
+    content_type = 'application/x-ndjson'
+
+    def write(self, test_cases: TestCaseSource, service_name: str, destination: BinaryIO):
+        for batch in _iter_batches(iter_export_rows(test_cases, service_name)):
+            destination.write(b''.join(orjson.dumps(dict(zip(EXPORT_COLUMNS, row))) + b'\n' for row in batch))
+
+
+class ParquetExporter(TestCaseExporter):
+    """Parquet with string columns, one row group per batch (needs pyarrow)"""
+
+    name = 'parquet'
+    suffix = '.parquet'
+    content_type = 'application/vnd.apache.parquet'
+
+    def is_available(self) -> bool:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def write(self, test_cases: TestCaseSource, service_name: str, destination: BinaryIO):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        with pq.ParquetWriter(destination, schema) as writer:
+            for batch in _iter_batches(iter_export_rows(test_cases, service_name)):
+                columns = [pa.array([None if value is None else str(value) for value in values], pa.string())
+                           for values in zip(*batch)]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+EXPORTERS: Dict[str, TestCaseExporter] = {
+    exporter.name: exporter
+    for exporter in (XlsxExporter(), CsvExporter(), JsonLinesExporter(), ParquetExporter())
+}
+
+
+def get_exporter(export_format: Optional[str] = None) -> TestCaseExporter:
+    """Exporter for a format name; raises ValueError for unknown or unavailable formats"""
+    export_format = (export_format or DEFAULT_EXPORT_FORMAT).lower()
+    exporter = EXPORTERS.get(export_format)
+    if exporter is None:
+        raise ValueError(f"Unsupported export format: {export_format}. Choose one of {', '.join(EXPORTERS)}")
+    if not exporter.is_available():
+        raise ValueError(f"Export format {export_format} is not available on this server")
+    return exporter
+
+
+def content_type_for(filepath: str) -> str:
+    """Content type of an exported file, from its suffix"""
+    for exporter in EXPORTERS.values():
+        if filepath.endswith(exporter.suffix):
+            return exporter.content_type
+    return TestCaseExporter.content_type
+
+
+def generate_testcase_export(test_cases: TestCaseSource, service_name: str, export_format: Optional[str] = None,
+                             export_id: Optional[str] = None) -> Optional[str]:
+    """Write an export to files/<export_id><suffix> and return the export ID, like ``generate_testcase_excel`` for any format.
+
+    Returns None if the format is unknown or the export failed.
+    """
+    try:
+        exporter = get_exporter(export_format)
+        export_id = export_id or new_file_id()
+        export_store.write_atomic(export_id, exporter.suffix, functools.partial(exporter.write, test_cases, service_name))
+        sweep_generated_files()
+        return export_id
+    except Exception as e:
+        logger.error(f"Error generating {export_format or DEFAULT_EXPORT_FORMAT} export: {e}")
+        return None
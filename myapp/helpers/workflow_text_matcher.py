@@ -0,0 +1,236 @@
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_KEYWORDS = {
+    'actions': ['apply', 'login', 'payment', 'approve', 'decline', 'submit', 'confirm', 'receive', 'send'],
+    'actors': ['applicant', 'officer', 'user', 'system', 'admin', 'citizen', 'irembogov engine'],
+    'decision_words': ['successful', 'approved', 'declined', 'yes', 'no', 'decision'],
+    'notification_words': ['notification', 'email', 'sms', 'message', 'alert'],
+    'process_words': ['start', 'end', 'stop', 'begin', 'finish', 'process']
+}
+
+# Element groups reported by detect_workflow_elements, keyed by output name
+ELEMENT_GROUPS = (
+    ('actions', 'actions'),
+    ('actors', 'actors'),
+    ('decisions', 'decision_words'),
+)
+
+STRUCTURE_KEYWORDS = {
+    'has_swimlanes': ['applicant', 'officer', 'system', 'engine'],
+    'has_decision_points': ['yes', 'no', 'successful', 'approved', 'declined'],
+    'has_notifications': ['notification', 'email', 'sms', 'message'],
+    'has_payment_flow': ['payment', 'bill id'],
+    'has_approval_process': ['approve', 'approval', 'confirm']
+}
+
+ACTOR_PATTERNS: List[Tuple[Pattern, str]] = [
+    (re.compile(pattern), role_name) for pattern, role_name in [
+        (r'district\s+applicant', 'District Applicant'),
+        (r'rab\s+officer', 'RAB Officer'),
+        (r'applicant', 'Applicant'),
+        (r'officer', 'Officer'),
+        (r'user', 'User'),
+        (r'citizen', 'Citizen'),
+        (r'system', 'System'),
+        (r'engine', 'System Engine')
+    ]
+]
+
+STEP_PATTERNS: List[Pattern] = [re.compile(pattern) for pattern in [
+    r'login\s+to\s+(?:the\s+)?portal',
+    r'apply\s+for\s+[\w\s]+',
+    r'make\s+payment',
+    r'receive\s+notification',
+    r'confirm\s+[\w\s]+',
+    r'approve\s+[\w\s]*',
+    r'decline\s+[\w\s]*',
+    r'send\s+notification'
+]]
+
+DECISION_PATTERNS: List[Pattern] = [re.compile(pattern) for pattern in [
+    r'is\s+payment\s+successful',
+    r'approved\s+or\s+decline',
+    r'yes\s+or\s+no',
+    r'successful\s+\?'
+]]
+
+NOTIFICATION_PATTERNS: List[Pattern] = [re.compile(pattern) for pattern in [
+    r'user\s+receives\s+email\s+notification',
+    r'notification\s+is\s+sent',
+    r'email\s+notification\s+for\s+[\w\s]+',
+    r'sms\s+notification'
+]]
+
+COMMON_OUTCOMES = [
+    ['yes', 'no'],
+    ['approved', 'declined'],
+    ['successful', 'failed'],
+    ['accept', 'reject']
+]
+
+SYSTEM_ROLES = ('System', 'System Engine')
+
+
+class WorkflowTextIndex:
+    """Tokenized view of one OCR text, built once and shared by every matcher.
+
+    The text is lowercased and split a single time. Word lookups match every
+    word containing the token, like ``contains`` does for the whole text; they
+    scan the distinct words once per token rather than every word, and results
+    are cached per token.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_lower = text.lower()
+        self.words = text.split()
+        self.words_lower = [word.lower() for word in self.words]
+        self._word_positions: Optional[Dict[str, List[int]]] = None
+        self._token_positions: Dict[str, List[int]] = {}
+
+    def contains(self, keyword: str) -> bool:
+        return keyword in self.text_lower
+
+    def word_indices(self, token: str) -> List[int]:
+        """Positions, in order, of every word containing ``token`` (case-insensitive)"""
+        token = token.lower()
+        positions = self._token_positions.get(token)
+        if positions is None:
+            if self._word_positions is None:
+                word_positions = defaultdict(list)
+                for idx, word in enumerate(self.words_lower):
+                    word_positions[word].append(idx)
+                self._word_positions = dict(word_positions)
+            positions = sorted(
+                idx for word, indices in self._word_positions.items() if token in word for idx in indices
+            )
+            self._token_positions[token] = positions
+        return positions
+
+    def context(self, keyword: str, context_window: int = 10) -> str:
+        """Words around every occurrence of ``keyword``, joined with ' | '"""
+        contexts = []
+        for idx in self.word_indices(keyword):
+            start = max(0, idx - context_window)
+            end = min(len(self.words), idx + context_window + 1)
+            contexts.append(' '.join(self.words[start:end]))
+        return ' | '.join(contexts)
+
+
+class WorkflowTextMatcher:
+    """Precompiled workflow keyword and pattern matcher.
+
+    ``analyze`` tokenizes the text once and derives the structure flags,
+    workflow elements, actors, process steps, decision points and
+    notifications from that shared index.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]] = None):
+        self.keywords = keywords or WORKFLOW_KEYWORDS
+        self._last_index: Optional[WorkflowTextIndex] = None
+
+    def index(self, text: Union[str, WorkflowTextIndex]) -> WorkflowTextIndex:
+        """Index for ``text``; the most recent one is reused, so per-text lookups tokenize once"""
+        if isinstance(text, WorkflowTextIndex):
+            return text
+        index = self._last_index
+        if index is None or index.text != text:
+            index = WorkflowTextIndex(text)
+            self._last_index = index
+        return index
+
+    def analyze(self, text: Union[str, WorkflowTextIndex]) -> Dict[str, Any]:
+        index = self.index(text)
+        return {
+            'workflow_analysis': self.analyze_structure(index),
+            'workflow_elements': self.detect_elements(index),
+            'actors_and_roles': self.extract_actors(index),
+            'process_steps': self.identify_steps(index),
+            'decision_points': self.detect_decisions(index),
+            'notifications': self.extract_notifications(index)
+        }
+
+    def analyze_structure(self, index: WorkflowTextIndex) -> Dict[str, bool]:
+        return {
+            flag: any(index.contains(keyword) for keyword in keywords)
+            for flag, keywords in STRUCTURE_KEYWORDS.items()
+        }
+
+    def detect_elements(self, index: WorkflowTextIndex) -> Dict[str, List[str]]:
+        elements = defaultdict(list)
+        for element_type, keyword_group in ELEMENT_GROUPS:
+            for keyword in self.keywords[keyword_group]:
+                if index.contains(keyword):
+                    context = index.context(keyword)
+                    if context:
+                        elements[element_type].append(context)
+        return dict(elements)
+
+    def extract_actors(self, index: WorkflowTextIndex) -> List[Dict[str, str]]:
+        actors = []
+        for pattern, role_name in ACTOR_PATTERNS:
+            if pattern.search(index.text_lower):
+                actors.append({
+                    'name': role_name,
+                    'type': 'system' if role_name in SYSTEM_ROLES else 'human',
+                    'context': index.context(role_name.split()[0])
+                })
+        return actors
+
+    def identify_steps(self, index: WorkflowTextIndex) -> List[Dict[str, str]]:
+        steps = []
+        for i, pattern in enumerate(STEP_PATTERNS):
+            for match in pattern.findall(index.text_lower):
+                steps.append({
+                    'step_number': str(i + 1),
+                    'action': match.title(),
+                    'type': 'user_action' if any(word in match for word in ['login', 'apply', 'make']) else 'system_action'
+                })
+        return steps
+
+    def detect_decisions(self, index: WorkflowTextIndex) -> List[Dict[str, Any]]:
+        decisions = []
+        outcomes = None
+        for pattern in DECISION_PATTERNS:
+            for match in pattern.findall(index.text_lower):
+                if outcomes is None:
+                    # Outcomes depend only on the text, so compute them once
+                    outcomes = self.decision_outcomes(index)
+                decisions.append({
+                    'decision_text': match.title(),
+                    'type': 'binary_decision',
+                    'possible_outcomes': list(outcomes)
+                })
+        return decisions
+
+    def decision_outcomes(self, index: WorkflowTextIndex) -> List[str]:
+        for outcome_pair in COMMON_OUTCOMES:
+            if all(index.contains(outcome) for outcome in outcome_pair):
+                return list(set(outcome_pair))
+        return []
+
+    def extract_notifications(self, index: WorkflowTextIndex) -> List[Dict[str, str]]:
+        notifications = []
+        for pattern in NOTIFICATION_PATTERNS:
+            for match in pattern.findall(index.text_lower):
+                notifications.append({
+                    'type': 'email' if 'email' in match else 'sms' if 'sms' in match else 'general',
+                    'description': match.title(),
+                    'trigger': self.notification_trigger(index, match)
+                })
+        return notifications
+
+    def notification_trigger(self, index: WorkflowTextIndex, notification_text: str) -> str:
+        indices = index.word_indices(notification_text.split()[0])
+        if not indices:
+            return "Unknown trigger"
+        i = indices[0]
+        return ' '.join(index.words_lower[max(0, i - 5):i]).title()
+
+
+workflow_text_matcher = WorkflowTextMatcher()
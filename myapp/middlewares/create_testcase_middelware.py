@@ -1,8 +1,8 @@
 from ..helpers.excel_generator import ExcelGenerator
+from ..helpers.generated_files import sweep_generated_files
 
 from mysite import settings
 import os
-import shutil
 
 class CreateTestCaseMiddleWare:
     def __init__(self, pageId):
@@ -15,7 +15,8 @@ class CreateTestCaseMiddleWare:
         self.testcasesDir = "files"
 
     def testcase_generation (self):
-        # shutil.rmtree(self.testcasesDir)
+        # Expire old generated files instead of wiping directories other requests may be using
+        sweep_generated_files()
 
         # res = self.notionClient.notion_to_markdown(self.notionPageId)
 
@@ -35,6 +36,4 @@ class CreateTestCaseMiddleWare:
         
         
 
-        # shutil.rmtree(self.imagesDir)
-
         return 'excelFile'
\ No newline at end of file
@@ -1,3 +1,430 @@
-from django.test import TestCase
+import datetime
+import importlib.util
+import unittest
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+
+def _installed(*modules) -> bool:
+    return all(importlib.util.find_spec(module) is not None for module in modules)
+
+
+@unittest.skipUnless(_installed('torch', 'transformers'), "CLIP backends need torch and transformers")
+class ClipBackendParityTests(SimpleTestCase):
+    """Each optimized CLIP backend must produce embeddings close to fp32 torch"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from transformers import CLIPProcessor, CLIPModel
+        from .helpers.model_registry import CLIP_MODEL_NAME
+
+        cls.model_name = CLIP_MODEL_NAME
+        try:
+            cls.processor = CLIPProcessor.from_pretrained(CLIP_MODEL_NAME)
+            cls.reference_model = CLIPModel.from_pretrained(CLIP_MODEL_NAME).eval()
+        except (OSError, ValueError) as e:
+            # No network access and no local copy of the model
+            raise unittest.SkipTest(f"Cannot load {CLIP_MODEL_NAME}: {e}")
+
+    def assertBackendParity(self, backend):
+        from .helpers.clip_backends import PARITY_THRESHOLD, build_backend_model, check_backend_parity
+
+        candidate = build_backend_model(self.model_name, self.reference_model, backend)
+        similarity = check_backend_parity(self.processor, self.reference_model, candidate)
+        self.assertGreaterEqual(similarity, PARITY_THRESHOLD, f"{backend} embeddings drift from fp32 torch")
+
+    def test_torch_int8_parity(self):
+        from .helpers.clip_backends import BACKEND_TORCH_INT8
+
+        self.assertBackendParity(BACKEND_TORCH_INT8)
+
+    @unittest.skipUnless(_installed('onnxruntime'), "ONNX backend needs onnxruntime")
+    def test_onnx_parity(self):
+        from .helpers.clip_backends import BACKEND_ONNX
+
+        self.assertBackendParity(BACKEND_ONNX)
+
+
+class DataFrameExtractionTests(SimpleTestCase):
+    """The vectorized header search and row extraction match the original row loop"""
+
+    SAMPLE_ROWS = [
+        ['Test Execution Report - Passport Renewal (PR-01)', '', '', '', ''],
+        ['', '', '', '', ''],
+        ['Use Case', 'Test Scenario', 'Priority', 'Expected Result', 'Status'],
+        ['Apply', ' Submit a complete application ', 'P1', 'Application saved', 'Passed'],
+        ['', 'Submit without documents', 'P2', 'Validation error shown', 'Failed'],
+        ['Payment', '', '', 'No priority, skipped', ''],
+        ['', '', '', '', ''],
+        ['Approval', 'Officer approves', 'P1', ' Applicant notified ', ''],
+        ['Notes', 'Trailing row', 'P3', '', 'Blocked'],
+    ]
+
+    def setUp(self):
+        import pandas as pd
+        from .helpers.excel_processor import ExcelProcessor
+
+        self.processor = ExcelProcessor()
+        self.df = pd.DataFrame(self.SAMPLE_ROWS)
+
+    def _row_loop_header_row(self, df):
+        for idx, row in df.iterrows():
+            row_text = ' '.join([str(cell).lower() for cell in row if cell])
+            header_indicators = ['use case', 'test scenario', 'priority', 'expected result']
+            if sum(1 for indicator in header_indicators if indicator in row_text) >= 2:
+                return idx
+        return -1
+
+    def _row_loop_test_cases(self, df):
+        header_row_idx = self._row_loop_header_row(df)
+        headers = [str(h).strip() for h in df.iloc[header_row_idx].tolist() if str(h).strip()]
+        mapped_headers = [self.processor.column_mappings.get(header.lower().strip(), header) for header in headers]
+
+        test_cases = []
+        for idx in range(header_row_idx + 1, len(df)):
+            row = df.iloc[idx].tolist()
+            if not any(str(cell).strip() for cell in row if cell):
+                continue
+            test_case = {}
+            for i, (header, value) in enumerate(zip(mapped_headers, row)):
+                if header and i < len(row):
+                    test_case[header] = str(value).strip() if value else ""
+            if (test_case.get('Use Case') or test_case.get('Test Scenario')) and test_case.get('Priority'):
+                test_cases.append(test_case)
+        return test_cases
+
+    def test_header_row_matches_row_loop(self):
+        self.assertEqual(self.processor._find_header_row(self.df), self._row_loop_header_row(self.df))
+        self.assertEqual(self.processor._find_header_row(self.df.iloc[3:]), -1)
+
+    def test_test_cases_match_row_loop(self):
+        expected = self._row_loop_test_cases(self.df)
+        self.assertEqual(len(expected), 4)
+        self.assertEqual(self.processor._extract_test_cases_from_dataframe(self.df).to_dicts(), expected)
+
+    def _sample_workbook(self):
+        import io
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        for row in self.SAMPLE_ROWS:
+            workbook.active.append(row)
+        excel_file = io.BytesIO()
+        workbook.save(excel_file)
+        return excel_file
+
+    def test_comprehensive_data_returns_test_case_dicts(self):
+        test_cases = self.processor.extract_comprehensive_data_from_excel(self._sample_workbook())['test_cases']
+        self.assertIsInstance(test_cases, list)
+        self.assertEqual([test_case['Priority'] for test_case in test_cases], ['P1', 'P2', 'P1', 'P3'])
+
+    def test_comprehensive_data_can_keep_the_table(self):
+        from .helpers.test_case_table import TestCaseTable
+
+        expected = self.processor.extract_comprehensive_data_from_excel(self._sample_workbook())['test_cases']
+        for results in (
+            [self.processor.extract_comprehensive_data_from_excel(self._sample_workbook(), as_table=True)],
+            self.processor.extract_comprehensive_data_from_excel_files([self._sample_workbook()], as_table=True),
+        ):
+            test_cases = results[0]['test_cases']
+            self.assertIsInstance(test_cases, TestCaseTable)
+            self.assertEqual(len(test_cases), 4)
+            self.assertEqual(test_cases.to_dicts(), expected)
+
+    def test_lazy_raw_sheets_outlive_the_upload(self):
+        excel_file = self._sample_workbook()
+        raw_sheets = self.processor.extract_comprehensive_data_from_excel(excel_file, lazy_raw_sheets=True)['raw_sheets_data']
+        excel_file.close()
+
+        self.assertEqual(raw_sheets['Sheet'][2], self.SAMPLE_ROWS[2])
+        self.assertEqual(len(raw_sheets['Sheet']), len(self.SAMPLE_ROWS))
+
+
+class ExcelGeneratorTests(SimpleTestCase):
+    TEST_CASES = [
+        {'Use Case': 'Apply', 'Test Scenario': 'Submit the application', 'Priority': 'P1', 'Expected Result': 'Saved'},
+        {'Use Case': 'Apply', 'Test Scenario': 'Submit without documents', 'Priority': 'P2'},
+        {'Use Case': 'Approve', 'Test Scenario': 'Officer approves', 'Priority': 'P1', 'Input': 'Application ID'},
+        {'Use Case': 'Notify', 'Test Scenario': 'Applicant receives email'},
+    ]
+
+    def _load(self, data: bytes):
+        import io
+        import openpyxl
+
+        return openpyxl.load_workbook(io.BytesIO(data))
+
+    def test_summary_counts_p1_test_cases(self):
+        from .helpers.excel_generator import ExcelGenerator
+        from .helpers.test_case_table import TestCaseTable
+
+        for streaming in (False, True):
+            for test_cases in (self.TEST_CASES, TestCaseTable.from_records(self.TEST_CASES)):
+                with self.subTest(streaming=streaming, source=type(test_cases).__name__):
+                    workbook = self._load(ExcelGenerator().get_excel_bytes(test_cases, 'Passport', streaming=streaming))
+                    summary = [cell.value for cell in workbook['Summary'][2]]
+                    self.assertEqual(summary[:2], ['Passport', 2])
+                    self.assertEqual(summary[7], 4)
+
+    def test_write_only_workbook_matches_regular_engine(self):
+        from .helpers.excel_generator import ExcelGenerator
+
+        regular = self._load(ExcelGenerator().get_excel_bytes(self.TEST_CASES, 'Passport'))
+        # The streaming engine reads its input once, so a generator is enough
+        streamed = self._load(ExcelGenerator().get_excel_bytes((tc for tc in self.TEST_CASES), 'Passport', streaming=True))
+
+        self.assertEqual(streamed.sheetnames, regular.sheetnames)
+        for name in regular.sheetnames:
+            with self.subTest(sheet=name):
+                expected, actual = regular[name], streamed[name]
+                self.assertEqual(
+                    [[(cell.value, cell.style) for cell in row] for row in actual.iter_rows()],
+                    [[(cell.value, cell.style) for cell in row] for row in expected.iter_rows()]
+                )
+                self.assertEqual(
+                    {letter: dimension.width for letter, dimension in actual.column_dimensions.items()},
+                    {letter: dimension.width for letter, dimension in expected.column_dimensions.items()}
+                )
+        self.assertEqual(streamed['Test Cases'].freeze_panes, 'A2')
+        self.assertEqual(streamed['Test Cases']['C2'].style, 'Test Case P1')
+
+
+class TextChunkTests(SimpleTestCase):
+    """Text chunks stay within the size budget and cover every test case"""
+
+    def setUp(self):
+        import io
+        import openpyxl
+        from .helpers.excel_processor import ExcelProcessor
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['Use Case', 'Test Scenario', 'Priority', 'Expected Result'])
+        for number in range(1, 41):
+            sheet.append([f'Use case {number}', f'Scenario {number} ' + 'with details ' * (number % 7), 'P1', 'Works'])
+        sheet.append(['Long', 'word ' * 300, 'P2', 'Still embedded'])
+        self.excel_file = io.BytesIO()
+        workbook.save(self.excel_file)
+        self.processor = ExcelProcessor()
+
+    def count_words(self, text: str) -> int:
+        # Stand-in for a tokenizer: one token per word plus start/end tokens
+        return len(text.split()) + 2
+
+    def test_chunks_cover_the_text_representation(self):
+        chunks = list(self.processor.iter_text_chunks(self.excel_file, max_size=100000))
+        representation = self.processor.extract_text_representation(self.excel_file)
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0].id, 'Sheet!2')
+        self.assertEqual(chunks[0].text, representation.split("TEST CASES:\n", 1)[1].rstrip("\n"))
+
+    def test_chunks_are_bounded_by_the_measure(self):
+        chunks = list(self.processor.iter_text_chunks(self.excel_file, max_size=77, measure=self.count_words))
+
+        self.assertTrue(all(self.count_words(chunk.text) <= 77 for chunk in chunks))
+        split_parts = [chunk for chunk in chunks if chunk.id.startswith('Sheet!42#')]
+        self.assertGreater(len(split_parts), 1)
+        self.assertEqual(' '.join(' '.join(chunk.text.split()) for chunk in split_parts).count('word'), 300)
+        self.assertIn('Still embedded', split_parts[-1].text)
+
+        numbers = [int(line.split()[2].rstrip(':')) for chunk in chunks for line in chunk.text.split('\n')
+                   if line.startswith('Test Case ')]
+        self.assertEqual(numbers, list(range(1, 42)))
+
+    def test_read_errors_propagate(self):
+        import io
+
+        with self.assertRaises(Exception):
+            list(self.processor.iter_text_chunks(io.BytesIO(b'not a workbook')))
+
+
+class ExportViewTests(SimpleTestCase):
+    def setUp(self):
+        import os
+        import tempfile
+
+        # Exports are stored under the working directory
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.workdir.name)
+
+    def test_exports_are_stored_for_download(self):
+        from django.urls import reverse
+
+        test_cases = [{'Use Case': 'Apply', 'Test Scenario': 'Submit the application', 'Priority': 'P1'}]
+        response = self.client.post(reverse('export_testcases') + '?export_format=csv',
+                                    {'test_cases': test_cases, 'service_name': 'Passport'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        exported = b''.join(response.streaming_content)
+        self.assertIn(b'Submit the application', exported)
+
+        download = self.client.get(reverse('download_export', args=[response['X-Export-Id']]))
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download['Content-Type'], 'text/csv')
+        self.assertEqual(b''.join(download.streaming_content), exported)
+
+    def test_generated_workbook_is_found_by_export_id(self):
+        from .helpers.excel_generator import ExcelGenerator
+        from .helpers.generated_files import export_store
+
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                export_id = ExcelGenerator().generate_testcase_excel([{'Use Case': 'Apply'}], 'Passport', streaming=streaming)
+                self.assertTrue(export_store.find(export_id).endswith(f'{export_id}.xlsx'))
+
+    def test_rejects_test_cases_that_are_not_objects(self):
+        from django.urls import reverse
+
+        for test_cases in ('Apply', ['Apply', 'Approve'], [{'Use Case': 'Apply'}, None]):
+            with self.subTest(test_cases=test_cases):
+                response = self.client.post(reverse('export_testcases'), {'test_cases': test_cases},
+                                            content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+
+class TestCaseExporterTests(SimpleTestCase):
+    """Every export format reads back to the rows of the generated workbook"""
+
+    TEST_CASES = ExcelGeneratorTests.TEST_CASES
+
+    def setUp(self):
+        from .helpers.testcase_exporters import EXPORT_COLUMNS, iter_export_rows
+
+        self.columns = EXPORT_COLUMNS
+        self.expected = [list(row) for row in iter_export_rows(self.TEST_CASES, 'Passport')]
+
+    def export(self, export_format: str) -> bytes:
+        import io
+        from .helpers.testcase_exporters import get_exporter
+
+        destination = io.BytesIO()
+        get_exporter(export_format).write(self.TEST_CASES, 'Passport', destination)
+        return destination.getvalue()
+
+    def test_xlsx_round_trip(self):
+        import io
+        import openpyxl
+
+        sheet = openpyxl.load_workbook(io.BytesIO(self.export('xlsx')))['Test Cases']
+        rows = [['' if value is None else value for value in row] for row in sheet.iter_rows(min_row=2, values_only=True)]
+        self.assertEqual(rows, [row[1:] for row in self.expected])
+
+    def test_csv_round_trip(self):
+        import csv
+        import io
+
+        rows = list(csv.reader(io.StringIO(self.export('csv').decode('utf-8'))))
+        self.assertEqual(rows, [self.columns, *self.expected])
+
+    def test_jsonl_round_trip(self):
+        import orjson
+
+        rows = [orjson.loads(line) for line in self.export('jsonl').splitlines()]
+        self.assertEqual(rows, [dict(zip(self.columns, row)) for row in self.expected])
+
+    @unittest.skipUnless(_installed('pyarrow'), "Parquet export needs pyarrow")
+    def test_parquet_round_trip(self):
+        import io
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(self.export('parquet')))
+        self.assertEqual(table.column_names, self.columns)
+        self.assertEqual([list(row.values()) for row in table.to_pylist()], self.expected)
+
+    def test_unknown_format_is_rejected(self):
+        from .helpers.testcase_exporters import get_exporter
+
+        with self.assertRaises(ValueError):
+            get_exporter('pdf')
+
+
+class WorkflowTextMatcherTests(SimpleTestCase):
+    """Keyword contexts and notification triggers match the original per-call word scans"""
+
+    TEXT = ("Applicant re-submits the form, then may reapply . The e-payment step follows ; "
+            "officers know the payment status and answer yes or no . "
+            "User receives email notification when the officer decides . SMS notification is sent")
+
+    def _baseline_context(self, text, keyword, context_window=10):
+        words = text.split()
+        contexts = []
+        for idx in [i for i, word in enumerate(words) if keyword.lower() in word.lower()]:
+            contexts.append(' '.join(words[max(0, idx - context_window):min(len(words), idx + context_window + 1)]))
+        return ' | '.join(contexts) if contexts else ""
+
+    def _baseline_trigger(self, text, notification_text):
+        words = text.lower().split()
+        for i, word in enumerate(words):
+            if notification_text.split()[0] in word:
+                return ' '.join(words[max(0, i - 5):i]).title()
+        return "Unknown trigger"
+
+    def test_contexts_match_substring_scan(self):
+        from .helpers.workflow_text_matcher import WORKFLOW_KEYWORDS, WorkflowTextIndex
+
+        index = WorkflowTextIndex(self.TEXT)
+        for keyword in [keyword for keywords in WORKFLOW_KEYWORDS.values() for keyword in keywords]:
+            with self.subTest(keyword=keyword):
+                self.assertEqual(index.context(keyword), self._baseline_context(self.TEXT, keyword))
+        self.assertEqual(index.context('payment').count(' | '), 1)
+        self.assertIn('know', index.context('no').split(' | ')[0])
+
+    def test_elements_keep_embedded_keywords(self):
+        from .helpers.workflow_text_matcher import WorkflowTextMatcher
+
+        actions = WorkflowTextMatcher().analyze(self.TEXT)['workflow_elements']['actions']
+        for keyword in ('submit', 'apply', 'payment'):
+            self.assertIn(self._baseline_context(self.TEXT, keyword), actions)
+
+    def test_notification_triggers_match_word_scan(self):
+        from .helpers.workflow_text_matcher import WorkflowTextMatcher
+
+        notifications = WorkflowTextMatcher().analyze(self.TEXT)['notifications']
+        self.assertTrue(notifications)
+        for notification in notifications:
+            self.assertEqual(notification['trigger'],
+                             self._baseline_trigger(self.TEXT, notification['description'].lower()))
+
+
+class WorkbookReaderTests(SimpleTestCase):
+    """Both workbook readers skip chart sheets and agree on cell values"""
+
+    def setUp(self):
+        import io
+        import openpyxl
+        from openpyxl.chart import BarChart, Reference
+        from .helpers.excel_processor import ExcelProcessor
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'Cases'
+        sheet.append(['Use Case', 'Test Scenario', 'Priority', 'Execution Date'])
+        sheet.append(['Apply', 'Submit the application', 'P1', datetime.datetime(2024, 1, 2)])
+        chart = BarChart()
+        chart.add_data(Reference(sheet, min_col=3, min_row=1, max_row=2))
+        workbook.create_chartsheet('Chart').add_chart(chart)
+        self.excel_file = io.BytesIO()
+        workbook.save(self.excel_file)
+        self.processor = ExcelProcessor()
+
+    def assertReadsTestCase(self):
+        data = self.processor.extract_comprehensive_data_from_excel(self.excel_file)
+        self.assertEqual(list(data['raw_sheets_data']), ['Cases'])
+        self.assertEqual(data['test_cases'], [{
+            'Use Case': 'Apply', 'Test Scenario': 'Submit the application', 'Priority': 'P1',
+            'Execution Date': '2024-01-02 00:00:00'
+        }])
+        self.assertEqual(len(list(self.processor.iter_text_chunks(self.excel_file))), 1)
+
+    def test_openpyxl_skips_chart_sheets(self):
+        with self.settings(EXCEL_READER_BACKEND='openpyxl'):
+            self.assertReadsTestCase()
+
+    @unittest.skipUnless(_installed('python_calamine'), "calamine reader needs python-calamine")
+    def test_calamine_matches_openpyxl(self):
+        with self.settings(EXCEL_READER_BACKEND='calamine'):
+            self.assertReadsTestCase()
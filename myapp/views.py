@@ -6,6 +6,13 @@ from rest_framework.exceptions import *
 from pathlib import Path
 from .middlewares.create_testcase_middelware import CreateTestCaseMiddleWare
 from .helpers.excel_generator import ExcelGenerator
+from .helpers.excel_processor import ExcelProcessor
+from .helpers.generated_files import export_store
+from .helpers.testcase_exporters import get_exporter, content_type_for, generate_testcase_export
+from itertools import islice
+
+# Read size used when streaming exported files to the client
+EXPORT_CHUNK_BYTES = 64 * 1024
 
 # Create your views here.
 def index(request):
@@ -15,16 +22,72 @@ def index(request):
 def create_document(request):
     """Create a new document with embedding"""
     try:
+        # Imported here so torch and the CLIP stack only load for the views that embed
+        from .helpers.image_processor import ImageProcessor, DEFAULT_EMBEDDING_BATCH_SIZE
+        
         testcaseFile = request.data['testcases']
         
+        excel_processor = ExcelProcessor()
+        image_processor = ImageProcessor()
+        if image_processor.model is None:
+            raise RuntimeError('CLIP model is not available')
+        
+        # Embed text chunks batch by batch while the workbook is still being read; chunks are
+        # bounded by CLIP's context so no test case text is truncated away. Each batch is
+        # persisted to the embedding cache as it is produced and not kept here, so memory
+        # stays flat however large the workbook is
+        chunks = excel_processor.iter_text_chunks(testcaseFile, image_processor.max_text_tokens,
+                                                  image_processor.count_text_tokens)
+        chunk_ids = []
+        while batch := list(islice(chunks, DEFAULT_EMBEDDING_BATCH_SIZE)):
+            if image_processor.generate_text_image_embeddings([chunk.text for chunk in batch]) is None:
+                raise RuntimeError('Failed to embed testcases document')
+            chunk_ids.extend(chunk.id for chunk in batch)
+        
         return Response({
             'message': 'Knowledge document created successfuly',
-            'data': 'ok',
+            'data': {'chunks': len(chunk_ids), 'chunk_ids': chunk_ids},
         }, status=status.HTTP_201_CREATED)
     except Exception as e:
         # print('\033[31m>>>>>>>>>>>>\033[0m', e)
         return Response({'error': 'A server error has occured'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['POST'])
+def bulk_create_documents(request):
+    """Create documents from many test case workbooks at once"""
+    try:
+        testcaseFiles = request.FILES.getlist('testcases')
+        if not testcaseFiles:
+            return Response({'error': 'No testcases files provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        excel_processor = ExcelProcessor()
+        # Only the test case counts are reported, so keep the compact table
+        results = excel_processor.extract_comprehensive_data_from_excel_files(testcaseFiles, lazy_raw_sheets=True,
+                                                                              as_table=True)
+        
+        documents = []
+        errors = []
+        for testcaseFile, result in zip(testcaseFiles, results):
+            if 'error' in result:
+                errors.append({'file': testcaseFile.name, 'error': result['error']})
+            else:
+                documents.append({'file': testcaseFile.name, 'test_cases': len(result.get('test_cases', []))})
+        
+        if not documents:
+            return Response({
+                'error': 'None of the testcases files could be processed',
+                'errors': errors,
+            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        
+        # Multi-Status when only some of the files were processed
+        return Response({
+            'message': 'Knowledge documents processed',
+            'data': documents,
+            'errors': errors,
+        }, status=status.HTTP_207_MULTI_STATUS if errors else status.HTTP_201_CREATED)
+    except Exception as e:
+        return Response({'error': 'A server error has occured'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['POST'])
 def create_testcase(request):
     try:
@@ -40,3 +103,57 @@ def create_testcase(request):
     except Exception as e:
         print(e)
         return Response({'error': 'Server error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+def export_testcases(request):
+    """Write test cases to a stored export, then send it back as a download.
+
+    The export is generated into files/ first and streamed from disk in
+    EXPORT_CHUNK_BYTES blocks, so it is never held in memory. The first byte
+    is only sent once the file is complete. ``export_format`` (query or body)
+    picks xlsx (styled, the default), csv, jsonl or parquet. The X-Export-Id
+    response header names the export for ``download_export``.
+    """
+    try:
+        testCases = request.data.get('test_cases')
+        if not isinstance(testCases, list):
+            return Response({'error': 'No test cases provided'}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(testCase, dict) for testCase in testCases):
+            return Response({'error': 'test_cases must be a list of objects'}, status=status.HTTP_400_BAD_REQUEST)
+        serviceName = request.data.get('service_name', '')
+        
+        try:
+            exporter = get_exporter(request.query_params.get('export_format') or request.data.get('export_format'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        exportId = generate_testcase_export(testCases, serviceName, exporter.name)
+        filepath = exportId and export_store.find(exportId)
+        if not filepath:
+            raise RuntimeError('Failed to generate test cases export')
+        
+        response = FileResponse(open(filepath, 'rb'), as_attachment=True, filename=f"testcases{exporter.suffix}",
+                                content_type=exporter.content_type)
+        response.block_size = EXPORT_CHUNK_BYTES
+        response['X-Export-Id'] = exportId
+        return response
+    except Exception as e:
+        return Response({'error': 'A server error has occured'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def download_export(request, export_id):
+    """Re-serve a previously generated export by its ID"""
+    filepath = export_store.find(export_id)
+    if filepath is None:
+        raise Http404('Export not found')
+    
+    try:
+        # The file may be swept between lookup and open
+        exportFile = open(filepath, 'rb')
+    except FileNotFoundError:
+        raise Http404('Export not found')
+    
+    response = FileResponse(exportFile, as_attachment=True, filename=f"testcases{Path(filepath).suffix}",
+                            content_type=content_type_for(filepath))
+    response.block_size = EXPORT_CHUNK_BYTES
+    return response
@@ -36,6 +36,33 @@ SUPABASE_URL = env('SUPABASE_URL')
 GOOGLE_GENERATIVE_AI_API_KEY = env('GOOGLE_GENERATIVE_AI_API_KEY')
 GROQ_API_KEY = env("GROQ_API_KEY")
 
+# CLIP inference backend for image/text embeddings: 'torch' (fp32), 'torch-int8' or 'onnx' (needs onnxruntime)
+CLIP_INFERENCE_BACKEND = env('CLIP_INFERENCE_BACKEND', default='torch')
+# Where the 'onnx' backend exports and loads its CLIP graphs; defaults to ./cache/onnx
+CLIP_ONNX_DIR = env('CLIP_ONNX_DIR', default=str(BASE_DIR / 'cache' / 'onnx'))
+
+# Directory of the on-disk embedding cache (SQLite); defaults to ./cache
+EMBEDDING_CACHE_DIR = env('EMBEDDING_CACHE_DIR', default=str(BASE_DIR / 'cache'))
+
+# Per-worker thread budgets for image processing. 'auto' divides the host's cores by
+# IMAGE_WORKER_COUNT (defaults to gunicorn's WEB_CONCURRENCY) so workers do not oversubscribe
+IMAGE_WORKER_COUNT = env.int('IMAGE_WORKER_COUNT', default=env.int('WEB_CONCURRENCY', default=1))
+IMAGE_TORCH_THREADS = env('IMAGE_TORCH_THREADS', default='auto')
+IMAGE_TORCH_INTEROP_THREADS = env('IMAGE_TORCH_INTEROP_THREADS', default='1')
+IMAGE_OPENCV_THREADS = env('IMAGE_OPENCV_THREADS', default='1')
+EASYOCR_BATCH_SIZE = env.int('EASYOCR_BATCH_SIZE', default=1)
+
+# Excel ingestion reader: 'openpyxl' (read-only streaming) or 'calamine' (needs python-calamine)
+EXCEL_READER_BACKEND = env('EXCEL_READER_BACKEND', default='openpyxl')
+# Size of the shared (spawned, created on first use) process pool for bulk workbook ingestion
+EXCEL_INGESTION_WORKERS = env.int('EXCEL_INGESTION_WORKERS', default=min(4, os.cpu_count() or 1))
+
+# Retention for generated files under files/ and images/: files older than MAX_AGE seconds
+# are removed, then the oldest until each directory fits MAX_BYTES; sweeps run every SWEEP_INTERVAL
+GENERATED_FILES_MAX_AGE = env.int('GENERATED_FILES_MAX_AGE', default=24 * 60 * 60)
+GENERATED_FILES_MAX_BYTES = env.int('GENERATED_FILES_MAX_BYTES', default=1024 * 1024 * 1024)
+GENERATED_FILES_SWEEP_INTERVAL = env.int('GENERATED_FILES_SWEEP_INTERVAL', default=10 * 60)
+
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
 